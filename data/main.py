@@ -1,7 +1,11 @@
 import json
+import os
 import random
 from datetime import datetime, timedelta
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RAW_PATH = os.path.join(BASE_DIR, "telecom_tower_usaged.json")
+
 uk_locations = [
     (51.5074, -0.1278),   # London
     (53.4808, -2.2426),   # Manchester
@@ -15,9 +19,9 @@ uk_locations = [
     (53.4084, -2.9916)    # Liverpool
 ]
 
-def generate_data(num_rows):
+def generate_data(num_rows, start=None):
     data = []
-    base_time = datetime(2025, 8, 22, 0, 0)
+    base_time = start or datetime(2025, 8, 22, 0, 0)
     for i in range(num_rows):
         lat, lon = random.choice(uk_locations)
         bandwidth_value = round(random.uniform(5, 100), 2)
@@ -96,7 +100,12 @@ def generate_data(num_rows):
         data.append(record)
     return data
 
-# Generate and save to file
-data = generate_data(9000)
-with open("telecom_tower_usaged.json", "w") as f:
-    json.dump(data, f, indent=2)
\ No newline at end of file
+def write_data(path=RAW_PATH, num_rows=9000):
+    data = generate_data(num_rows)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+if __name__ == "__main__":
+    # Generate and save to file
+    write_data()
@@ -1,46 +1,104 @@
+import os
+import pickle
+
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import IsolationForest
 
-df = pd.read_csv("data/cleaned_telecom_data.csv")
+from feature_store import ANOMALY_COLS, load_feature_store
+from paths import FINAL_PATH, GENERATED_FINAL_PATH
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CLEAN_PATH = os.path.join(BASE_DIR, "..", "data", "cleaned_telecom_data.csv")
+ANOMALY_MODEL_PATH = os.path.join(BASE_DIR, "..", "model", "anomaly_model.pkl")
+
+
+def preprocess(df):
+    # Ensure timestamp is datetime
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
 
-# Ensure timestamp is datetime
-df["timestamp"] = pd.to_datetime(df["timestamp"])
+    # Create call drop rate if not exists
+    if "call_drop_rate" not in df.columns:
+        df["call_drop_rate"] = (df["dropped_calls"] / df["total_calls"]) * 100
 
-# Create call drop rate if not exists
-if "call_drop_rate" not in df.columns:
-    df["call_drop_rate"] = (df["dropped_calls"] / df["total_calls"]) * 100
+    # Convert bandwidth to numeric (strip units if needed)
+    df["bandwidth_numeric"] = df["bandwidth"].replace(
+        {"Gbps": "e9", "Mbps": "e6"}, regex=True
+    )
+    df["bandwidth_numeric"] = (
+        df["bandwidth_numeric"].str.replace(r"[^0-9\.]", "", regex=True).astype(float)
+    )
+    return df
 
-# Convert bandwidth to numeric (strip units if needed)
-df["bandwidth_numeric"] = df["bandwidth"].replace(
-    {"Gbps": "e9", "Mbps": "e6"}, regex=True
-)
-df["bandwidth_numeric"] = (
-    df["bandwidth_numeric"].str.replace("[^0-9\.]", "", regex=True).astype(float)
-)
 
-# Ensure timestamp is datetime
-df["timestamp"] = pd.to_datetime(df["timestamp"])
+def anomaly_features(df, features=None):
+    """
+    float32 (rows x 3) IsolationForest input, in training order: `features`,
+    the feature store's block for the rows (see Dataset.feature_block), as
+    is; else, for rows no store holds yet (the cleaned data, live batches),
+    a float32 copy of `df`'s 3 columns.
+    """
+    if features is None:
+        features = df[ANOMALY_COLS].to_numpy(dtype=np.float32)
+    if np.isnan(features).any():
+        features = np.nan_to_num(features)
+    return features
 
-# Create call drop rate if not exists
-if "call_drop_rate" not in df.columns:
-    df["call_drop_rate"] = (df["dropped_calls"] / df["total_calls"]) * 100
 
-# Convert bandwidth to numeric (strip units if needed)
-df["bandwidth_numeric"] = df["bandwidth"].replace(
-    {"Gbps": "e9", "Mbps": "e6"}, regex=True
-)
-df["bandwidth_numeric"] = (
-    df["bandwidth_numeric"].str.replace("[^0-9\.]", "", regex=True).astype(float)
-)
+def label_anomalies(pred):
+    return pd.Series(pred).map({1: "Normal", -1: "Anomaly"}).to_numpy()
+
 
 # -------------------
 # Anomaly Detection (Latency + Drop Rate)
 # -------------------
-features = df[["latency_sec", "call_drop_rate", "bandwidth_numeric"]].fillna(0)
-iso = IsolationForest(contamination=0.05, random_state=42)
-df["anomaly"] = iso.fit_predict(features)
-df["anomaly"] = df["anomaly"].map({1: "Normal", -1: "Anomaly"})
+def fit_model(features):
+    """An IsolationForest fitted on an anomaly_features() block."""
+    # Imported here: loading and scoring a saved model doesn't need it up front
+    from sklearn.ensemble import IsolationForest
+
+    return IsolationForest(contamination=0.05, random_state=42).fit(features)
+
+
+def detect_anomalies(df, features=None):
+    """Fit the IsolationForest on `df` and add the `anomaly` column."""
+    features = anomaly_features(df, features)
+    iso = fit_model(features)
+    df["anomaly"] = label_anomalies(iso.predict(features))
+    return df, iso
+
+
+def save_model(iso, path=ANOMALY_MODEL_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        pickle.dump(iso, f)
+
+
+def load_or_fit_model(path=ANOMALY_MODEL_PATH, final_path=FINAL_PATH):
+    """Load the persisted IsolationForest, fitting (once) on `final_path` if absent."""
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    # Fitted on the file's feature store slice; the CSV is only parsed if
+    # the store has to be built
+    store = load_feature_store(source_path=final_path)
+    iso = fit_model(anomaly_features(None, store.view(ANOMALY_COLS)))
+    save_model(iso, path)
+    return iso
+
+
+def score(df, iso, features=None):
+    """Label new rows with an already fitted IsolationForest (no refit)."""
+    df["anomaly"] = label_anomalies(iso.predict(anomaly_features(df, features)))
+    return df
+
+
+def run(clean_path=CLEAN_PATH, final_path=GENERATED_FINAL_PATH, model_path=ANOMALY_MODEL_PATH):
+    df = preprocess(pd.read_csv(clean_path))
+    df, iso = detect_anomalies(df)
+    df.to_csv(final_path, index=False)
+    save_model(iso, model_path)
+    return df
 
 
-df.to_csv("final_data.csv", index=False)
\ No newline at end of file
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,234 @@
+"""
+Read-only JSON API served by the Dash Flask server under /api.
+
+    GET /api/kpis          KPI cards for the filter
+    GET /api/towers        per-tower aggregates over the filtered rows
+    GET /api/anomalies     anomalous rows
+    GET /api/timeseries    ?metric=latency_sec&freq=1h, mean per operator
+    GET /api/fleet/status  latest state per tower (tower_state.py)
+    GET /api/export        ?format=csv|parquet&columns=a,b  filtered rows as a download
+
+Filters are page1's: repeat `operator` / `network_type` to select several
+values, and `start` / `end` take ISO dates.
+
+Every response carries an ETag built from the data fingerprint and the
+request, checked before anything is computed, so a poll that sends
+If-None-Match gets a 304 for the cost of a stat() call. Row results are
+memoized per data version. Results over MAX_JSON_ROWS rows (or any row
+result when `format=ndjson` / `Accept: application/x-ndjson`) are streamed
+as NDJSON in chunks. Exports are filtered and encoded chunk by chunk from
+the base frame (see export.py), so they run in constant memory.
+"""
+import functools
+import hashlib
+import json
+import math
+
+import pandas as pd
+from flask import Blueprint, Response, abort, request  # type: ignore
+
+from cache import LRUCache
+from dataset import filter_key, get_dataset, normalize_filters
+from export import FORMATS, encode
+from tower_state import get_tower_state
+
+api = Blueprint("api", __name__, url_prefix="/api")
+
+MAX_JSON_ROWS = 5000      # larger row results are streamed as NDJSON
+STREAM_CHUNK_ROWS = 1000
+TIMESERIES_METRICS = ["latency_sec", "dropped_calls", "bandwidth_numeric", "call_drop_rate"]
+ANOMALY_COLS = [
+    "timestamp", "tower_id", "operator", "network_type", "latency_sec",
+    "call_drop_rate", "bandwidth_numeric", "cluster",
+]
+
+RESULTS = LRUCache(maxsize=64, ttl=600)
+
+
+def _date_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        valid = pd.Timestamp(value) is not pd.NaT
+    except (ValueError, TypeError, OverflowError):
+        valid = False
+    if not valid:
+        abort(400, f"{name} must be an ISO date, got {value!r}")
+    return value
+
+
+def _filters():
+    return normalize_filters(
+        request.args.getlist("operator"),
+        request.args.getlist("network_type"),
+        _date_arg("start"),
+        _date_arg("end"),
+    )
+
+
+def _etag(dataset):
+    # Same data files + same request -> same tag, in every worker
+    args = sorted(request.args.items(multi=True))
+    h = hashlib.sha1(json.dumps([request.path, args]).encode())
+    return f"{dataset.fingerprint}-{h.hexdigest()[:16]}"
+
+
+def conditional(view):
+    """Answer 304 when If-None-Match matches, before the view computes anything."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        dataset = get_dataset()
+        dataset.refresh()  # rate limited; picks up new partitions
+        etag = _etag(dataset)
+        if etag in request.if_none_match:
+            response = Response(status=304)
+        else:
+            response = view(*args, **kwargs)
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"  # clients revalidate every time
+        return response
+    return wrapper
+
+
+def _memoized(name, filters, build):
+    dataset = get_dataset()
+    key = (name, filter_key(filters), tuple(sorted(request.args.items(multi=True))), dataset.version)
+    return RESULTS.get_or_build(key, build)
+
+
+def _wants_ndjson():
+    return (request.args.get("format") == "ndjson"
+            or request.accept_mimetypes.best == "application/x-ndjson")
+
+
+def _ndjson(frame):
+    for start in range(0, len(frame), STREAM_CHUNK_ROWS):
+        chunk = frame.iloc[start:start + STREAM_CHUNK_ROWS]
+        yield chunk.to_json(orient="records", lines=True, date_format="iso") + "\n"
+
+
+def rows_response(frame):
+    """JSON array for small results, chunked NDJSON for large ones (or on request)."""
+    if _wants_ndjson() or len(frame) > MAX_JSON_ROWS:
+        return Response(_ndjson(frame), mimetype="application/x-ndjson")
+    return Response(frame.to_json(orient="records", date_format="iso"), mimetype="application/json")
+
+
+def json_response(payload):
+    # NaN / Infinity aren't JSON: payloads map them to None (see _number)
+    return Response(json.dumps(payload, allow_nan=False), mimetype="application/json")
+
+
+def _number(value):
+    """float, or None for NaN (e.g. the mean of no rows)."""
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+@api.route("/kpis")
+@conditional
+def kpis():
+    filters = _filters()
+
+    def build():
+        dff = get_dataset().filter(filters)
+        return {
+            "rows": int(len(dff)),
+            "avg_latency_sec": _number(dff["latency_sec"].mean()),
+            "total_dropped_calls": int(dff["dropped_calls"].sum()),
+            "avg_bandwidth": _number(dff["bandwidth_numeric"].mean()),
+            "avg_call_drop_rate": _number(dff["call_drop_rate"].mean()),
+            "anomalies": int((dff["anomaly"] == "Anomaly").sum()),
+        }
+    return json_response(_memoized("kpis", filters, build))
+
+
+@api.route("/towers")
+@conditional
+def towers():
+    filters = _filters()
+
+    def build():
+        dff = get_dataset().filter(filters)
+        grouped = dff.assign(is_anomaly=dff["anomaly"] == "Anomaly").groupby("tower_id")
+        return grouped.agg(
+            readings=("latency_sec", "size"),
+            avg_latency_sec=("latency_sec", "mean"),
+            avg_call_drop_rate=("call_drop_rate", "mean"),
+            dropped_calls=("dropped_calls", "sum"),
+            total_calls=("total_calls", "sum"),
+            avg_bandwidth=("bandwidth_numeric", "mean"),
+            anomalies=("is_anomaly", "sum"),
+        ).reset_index()
+    return rows_response(_memoized("towers", filters, build))
+
+
+@api.route("/anomalies")
+@conditional
+def anomalies():
+    filters = _filters()
+
+    def build():
+        dff = get_dataset().filter(filters)
+        return dff.loc[dff["anomaly"] == "Anomaly", ANOMALY_COLS]
+    return rows_response(_memoized("anomalies", filters, build))
+
+
+@api.route("/timeseries")
+@conditional
+def timeseries():
+    filters = _filters()
+    metric = request.args.get("metric", "latency_sec")
+    freq = request.args.get("freq", "1h")
+    if metric not in TIMESERIES_METRICS:
+        abort(400, f"metric must be one of {', '.join(TIMESERIES_METRICS)}")
+
+    def build():
+        dff = get_dataset().filter(filters)
+        try:
+            buckets = dff["timestamp"].dt.floor(freq)
+        except ValueError:
+            abort(400, f"invalid freq {freq!r}")
+        out = dff.groupby([buckets, "operator"])[metric].mean().reset_index()
+        return out.rename(columns={metric: f"mean_{metric}"})
+    return rows_response(_memoized("timeseries", filters, build))
+
+
+@api.route("/fleet/status")
+@conditional
+def fleet_status():
+    """Latest state per tower with rolling 1h/24h aggregates (O(towers))."""
+    filters = _filters()
+    status = get_tower_state().snapshot(filters["operators"], filters["network_types"])
+    return rows_response(status)
+
+
+def _export_chunks(dataset, filters, columns):
+    empty = True
+    for chunk in dataset.iter_filtered(filters, columns):
+        empty = False
+        yield chunk
+    if empty:
+        yield dataset.parts()[0].iloc[:0][columns]  # header / schema only
+
+
+@api.route("/export")
+@conditional
+def export():
+    """Stream the filtered rows as CSV or Parquet, optionally only some columns."""
+    filters = _filters()
+    fmt = request.args.get("format", "csv")
+    if fmt not in FORMATS:
+        abort(400, f"format must be one of {', '.join(FORMATS)}")
+    dataset = get_dataset()
+    columns = [c for arg in request.args.getlist("columns") for c in arg.split(",") if c]
+    unknown = sorted(set(columns) - set(dataset.columns))
+    if unknown:
+        abort(400, f"unknown columns: {', '.join(unknown)}")
+    columns = columns or list(dataset.columns)
+
+    mimetype, ext = FORMATS[fmt]
+    response = Response(encode(_export_chunks(dataset, filters, columns), fmt), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f"attachment; filename=telecom_export.{ext}"
+    return response
@@ -1,10 +1,45 @@
+import os
+import sys
+
+# Pages import sibling modules (clustering, ...) as top-level names, both
+# under `gunicorn src.app:server` and `python src/app.py`.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
 import dash #type: ignore
 from dash import html #type: ignore
 import dash_bootstrap_components as dbc #type: ignore
 
+from api import api
+from background import manager
+import metrics
+import startup
+
 # Create Dash app
-app = dash.Dash(__name__, use_pages=True, external_stylesheets=[dbc.themes.BOOTSTRAP])
+app = dash.Dash(
+    __name__,
+    use_pages=True,
+    external_stylesheets=[dbc.themes.BOOTSTRAP],
+    background_callback_manager=manager,
+)
 server = app.server
+server.register_blueprint(api)
+
+# Per-callback timings / bytes / cache stats at /metrics (see metrics.py).
+# Registered before the fast path so response sizes are measured as sent.
+metrics.instrument(app)
+
+# Opt-in: orjson + packed figures + gzip/brotli responses (see fastpath.py)
+if os.environ.get("FAST_PATH") == "1":
+    import fastpath
+    fastpath.enable(app)
+
+# Data and models load on first use; the warm-up loads them in the background
+# so the worker serves at once (see startup.py). Background jobs and preloaded
+# Gunicorn workers fork from this process; forks wait for the warm-up and take
+# the shared data locks first, so no child inherits a held lock. WARMUP=0 turns
+# the warm-up off.
+if os.environ.get("WARMUP", "1") != "0":
+    startup.start_warmup()
 
 app.layout = dbc.Container(
     className="dark",
@@ -0,0 +1,26 @@
+// Theme switching without a server round trip: the toggle flips the
+// container class, and each figure swaps its template (and map style)
+// from the templates sent once in the "plot-templates" store.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    theme: {
+        toggle: function (n_clicks, current) {
+            if (current === "light") {
+                return ["dark", "☀️"];
+            }
+            return ["light", "🌙"];
+        },
+        swap: function (themeClass, figure, templates) {
+            if (!figure || !templates) {
+                return window.dash_clientside.no_update;
+            }
+            var theme = themeClass === "light" ? "light" : "dark";
+            var layout = Object.assign({}, figure.layout, {template: templates[theme]});
+            if (layout.map) {
+                layout.map = Object.assign({}, layout.map, {
+                    style: theme === "dark" ? "carto-darkmatter" : "carto-positron"
+                });
+            }
+            return Object.assign({}, figure, {layout: layout});
+        }
+    }
+});
@@ -0,0 +1,35 @@
+"""
+Background callback manager.
+
+Heavy callbacks (large trend builds, anomaly re-scoring, fleet what-if runs)
+run in a separate process via Dash's DiskcacheManager instead of holding a
+Gunicorn request worker. Results are stored in a disk cache shared by all
+workers, keyed by the callback inputs plus the data fingerprint, so identical
+requests are answered without recomputing.
+"""
+import os
+
+import diskcache  # type: ignore
+from dash import DiskcacheManager  # type: ignore
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, "..", ".cache", "callbacks")
+RESULT_TTL = 600  # seconds a cached result stays valid
+
+
+def data_fingerprint():
+    # Same files on disk -> same fingerprint in every worker
+    from dataset import get_dataset
+    return get_dataset().fingerprint
+
+
+def make_manager(name, cache_by):
+    """A manager with its own cache directory; `cache_by` values join the result key."""
+    return DiskcacheManager(
+        diskcache.Cache(os.path.join(CACHE_DIR, name)),
+        cache_by=cache_by,
+        expire=RESULT_TTL,
+    )
+
+
+manager = make_manager("app", [data_fingerprint])
@@ -0,0 +1,344 @@
+"""
+Benchmarks for the pipeline and dashboard hot paths at several data scales.
+
+    python src/benchmark.py run                          # 9k, 1M and 10M rows
+    python src/benchmark.py run --scales 9k 1M -o before.json
+    python src/benchmark.py compare before.json after.json
+
+Datasets come from the synthetic generator in data/main.py. Generating a
+record is pure Python, so at most SAMPLE_ROWS records are generated and
+larger scales repeat them with timestamps shifted forward: towers,
+operators and value ranges stay those of the generator, only the history
+gets longer. Ingest cleans raw records in SAMPLE_ROWS chunks up to the scale.
+
+Each benchmark is timed up to `--repeat` times (best run kept, stopping
+early once a run takes over LONG_RUN_SECONDS), then run once more under
+tracemalloc for its peak allocation. Dashboard callbacks are called directly
+on a Dataset built from the scale's final_data.csv, with the figure and
+filter caches cleared so every run is a cold build.
+
+Results are saved as JSON. `compare` flags benchmarks whose time or peak
+memory grew by more than --threshold (beyond a small absolute noise floor)
+and exits with status 1 if any did.
+"""
+import argparse
+import gc
+import glob
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, ".."))
+BENCH_DIR = os.path.join(ROOT_DIR, ".cache", "benchmarks")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from data_scripts import cleaner, generator  # noqa: E402
+
+SCALES = ["9k", "1M", "10M"]
+SAMPLE_ROWS = 50_000        # unique generated records; also the ingest chunk size
+SEED = 42
+REPEAT = 3
+LONG_RUN_SECONDS = 10.0     # no further repeats after a run this long
+PREDICT_CALLS = 20          # page2 predict is one row: timed per call over this many
+RECORD_MINUTES = 5          # generator spacing between records
+
+THRESHOLD = 0.10            # relative growth flagged by `compare`
+MIN_SECONDS = 0.005         # ... when also above these absolute differences
+MIN_BYTES = 1 << 20
+
+
+def parse_scale(text):
+    """'9k' -> 9000, '1M' -> 1000000, '250000' -> 250000."""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([kKmM]?)", text)
+    if not match:
+        raise argparse.ArgumentTypeError(f"bad scale {text!r}")
+    factor = {"": 1, "k": 1_000, "m": 1_000_000}[match.group(2).lower()]
+    return int(float(match.group(1)) * factor)
+
+
+# -------------------
+# Measurement
+# -------------------
+def measure(fn, setup=None, repeat=REPEAT, memory=True):
+    """
+    Time `fn()` (best of up to `repeat` runs) and, with `memory`, its
+    tracemalloc peak on one more run. `setup()` runs untimed before each
+    run. Returns (result dict, return value of the last timed run).
+    """
+    runs, value = [], None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        value = fn()
+        runs.append(time.perf_counter() - start)
+        if runs[-1] > LONG_RUN_SECONDS:
+            break
+    result = {"seconds": min(runs), "runs": runs}
+    if memory:
+        if setup:
+            setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+        finally:
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return result, value
+
+
+# -------------------
+# Datasets
+# -------------------
+def generate_records(rows):
+    random.seed(SEED)
+    return generator.generate_data(rows)
+
+
+def scale_frame(sample, rows):
+    """Repeat a cleaned sample to `rows` rows, shifting each copy past the last."""
+    m = len(sample)
+    idx = np.arange(rows)
+    frame = sample.iloc[idx % m].reset_index(drop=True)
+    frame["timestamp"] += pd.to_timedelta((idx // m) * m * RECORD_MINUTES, unit="min")
+    return frame
+
+
+def ingest(records, rows):
+    # clean_data.py logic over `rows` records, one chunk of raw records at a time
+    chunk = len(records)
+    for start in range(0, rows, chunk):
+        cleaner.clean(records[:min(chunk, rows - start)])
+
+
+def _drop_feature_caches(csv_path):
+    import feature_store
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    for path in glob.glob(os.path.join(feature_store.CACHE_DIR, f"{stem}-*")):
+        os.remove(path)
+    feature_store._stores.clear()
+
+
+# -------------------
+# One scale
+# -------------------
+def run_scale(label, rows, repeat=REPEAT, memory=True, only=None):
+    import anomaly_detection_model as adm
+    import dataset as dataset_module
+    from feature_store import FEATURE_COLS
+
+    page1 = sys.modules["pages.page1"]
+    page2 = sys.modules["pages.page2"]
+    results = {}
+
+    def bench(name, fn, setup=None, repeat=repeat, **extra):
+        if only and name not in only:
+            return None
+        result, value = measure(fn, setup, repeat, memory)
+        results[name] = dict(result, **extra)
+        peak = f"{result['peak_bytes'] / 1e6:>10.1f} MB" if memory else ""
+        print(f"  {name:<22}{result['seconds']:>10.3f}s{peak}", flush=True)
+        return value
+
+    def skip(name, reason):
+        if not only or name in only:
+            results[name] = {"skipped": reason}
+            print(f"  {name:<22}skipped: {reason}", flush=True)
+
+    # --- pipeline ---
+    records = generate_records(min(rows, SAMPLE_ROWS))
+    bench("ingest", lambda: ingest(records, rows))
+    sample = cleaner.clean(records)
+    del records
+    frame = scale_frame(sample, rows)
+    del sample
+
+    bench("bandwidth_convert", lambda: frame["bandwidth"].apply(cleaner.convert_bandwidth))
+    bench("bandwidth_parse", lambda: adm.preprocess(frame))
+    if "bandwidth_numeric" not in frame.columns:
+        adm.preprocess(frame)
+    iso = bench("iforest_fit", lambda: adm.detect_anomalies(frame)[1])
+    if iso is None:
+        frame, iso = adm.detect_anomalies(frame)
+    bench("iforest_score", lambda: adm.score(frame, iso))
+
+    features = frame[FEATURE_COLS]
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    csv_path = os.path.join(BENCH_DIR, f"final_data-{label}.csv")
+    partition_dir = os.path.join(BENCH_DIR, "no-partitions")
+    _drop_feature_caches(csv_path)
+    frame.to_csv(csv_path, index=False)
+    del frame
+
+    # --- dashboard ---
+    def cold_load():
+        _drop_feature_caches(csv_path)
+
+    ds = bench("dashboard_load", lambda: dataset_module.Dataset(csv_path, partition_dir), cold_load)
+    if ds is None:
+        ds = dataset_module.Dataset(csv_path, partition_dir)
+    dataset_module._dataset = ds
+
+    ops, nts = ["EE", "O2"], ["4G", "5G"]
+    filters = dataset_module.normalize_filters(ops, nts)
+
+    def cold_filter():
+        ds._filtered.clear()
+        page1.FIGURES.clear()
+
+    def cold_figures():
+        page1.FIGURES.clear()
+        ds.filter(filters)  # filtered rows shared by every figure, as in the app
+
+    bench("page1_filter", lambda: ds.filter(page1.filter_and_store(ops, nts, None, None)), cold_filter)
+    bench("page1_kpis", lambda: page1.update_kpis(filters), cold_figures)
+    bench("page1_trends", lambda: page1.update_latency(lambda _: None, filters, "dark", []), cold_figures)
+    bench("page1_anomaly", lambda: page1.update_anomaly(filters, theme_class="dark"), cold_figures)
+    bench("page1_geo", lambda: page1.update_geo(filters, "dark"), cold_figures)
+
+    model, model_load_error = page2.get_model()
+    if model is None:
+        skip("page2_predict", model_load_error)
+        skip("page2_predict_batch", model_load_error)
+    else:
+        values = [page2.feature_ranges()[c][2] for c in FEATURE_COLS]
+
+        def predict_calls():
+            for _ in range(PREDICT_CALLS):
+                page2.predict(1, values)
+
+        bench("page2_predict", predict_calls, calls=PREDICT_CALLS)
+        if "page2_predict" in results:  # report per call
+            result = results["page2_predict"]
+            result["seconds"] /= PREDICT_CALLS
+            result["runs"] = [seconds / PREDICT_CALLS for seconds in result["runs"]]
+        x = features.fillna(pd.Series({c: r[2] for c, r in page2.feature_ranges().items()}))
+        bench("page2_predict_batch", lambda: page2.flag_towers(x))
+
+    page1.FIGURES.clear()
+    del ds, features
+    _drop_feature_caches(csv_path)
+    os.remove(csv_path)
+    return results
+
+
+# -------------------
+# Commands
+# -------------------
+def _meta(args, scales):
+    import dash  # type: ignore
+    import sklearn
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "versions": {"numpy": np.__version__, "pandas": pd.__version__,
+                     "sklearn": sklearn.__version__, "dash": dash.__version__},
+        "scales": scales,
+        "repeat": args.repeat,
+        "sample_rows": SAMPLE_ROWS,
+        "memory": not args.no_memory,
+    }
+
+
+def run(args):
+    # page2 resolves its model path against the working directory
+    os.chdir(ROOT_DIR)
+    # No background warm-up: each benchmark loads what it measures itself
+    os.environ.setdefault("WARMUP", "0")
+    import app  # noqa: F401  (registers the pages)
+
+    scales = {label: parse_scale(label) for label in args.scales}
+    report = {"meta": _meta(args, scales), "results": {}}
+    for label, rows in scales.items():
+        print(f"{label} ({rows:,} rows)", flush=True)
+        report["results"][label] = run_scale(label, rows, args.repeat, not args.no_memory, args.only)
+
+    out = args.output or os.path.join(
+        RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{report['meta']['commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {os.path.abspath(out)}")
+
+
+def _change(old, new, floor, threshold):
+    if old is None or new is None:
+        return None, False
+    ratio = (new - old) / old if old else 0.0
+    return ratio, ratio > threshold and new - old > floor
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        base = json.load(f)["results"]
+    with open(args.current) as f:
+        current = json.load(f)["results"]
+
+    regressions = 0
+    print(f"{'scale':<6}{'benchmark':<22}{'time':>10}{'change':>9}{'peak MB':>10}{'change':>9}")
+    for label, benches in current.items():
+        for name, new in benches.items():
+            old = base.get(label, {}).get(name)
+            if old is None or "skipped" in old or "skipped" in new:
+                continue
+            t, t_flag = _change(old["seconds"], new["seconds"], MIN_SECONDS, args.threshold)
+            m, m_flag = _change(old.get("peak_bytes"), new.get("peak_bytes"), MIN_BYTES, args.threshold)
+            mem = f"{new['peak_bytes'] / 1e6:>10.1f}" if "peak_bytes" in new else f"{'-':>10}"
+            mem_change = f"{m:>+8.0%}" if m is not None else f"{'-':>8}"
+            flags = [kind for kind, flagged in (("time", t_flag), ("memory", m_flag)) if flagged]
+            regressions += bool(flags)
+            note = f"  REGRESSION ({', '.join(flags)})" if flags else ""
+            print(f"{label:<6}{name:<22}{new['seconds']:>9.3f}s{t:>+8.0%} {mem}{mem_change} {note}")
+    print(f"{regressions} regression(s) over {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("run", help="run the benchmarks and save the results as JSON")
+    p.add_argument("--scales", nargs="+", default=SCALES, help="row counts, e.g. 9k 1M 10M")
+    p.add_argument("--repeat", type=int, default=REPEAT, help="timed runs per benchmark (best kept)")
+    p.add_argument("--only", nargs="+", help="run only these benchmarks")
+    p.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    p.add_argument("-o", "--output", help=f"results file (default: {os.path.relpath(RESULTS_DIR, ROOT_DIR)}/<time>-<commit>.json)")
+
+    p = commands.add_parser("compare", help="flag regressions between two result files")
+    p.add_argument("baseline")
+    p.add_argument("current")
+    p.add_argument("--threshold", type=float, default=THRESHOLD, help="relative growth flagged (default 0.10)")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        run(args)
+        return 0
+    return compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Small thread-safe LRU cache with a TTL, used to memoize filtered frames and
+built figures between callbacks (and across tab switches).
+
+Values are shared between requests, so callers must treat them as read-only.
+Lookups are reported to any registered listener (see metrics.py).
+Cache locks are held across forks (see startup.py), as background jobs read
+the caches in forked processes.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from startup import hold_across_fork
+
+_listeners = []
+
+
+def add_listener(fn):
+    """Call `fn(hit)` on every lookup in any LRUCache."""
+    _listeners.append(fn)
+
+
+def _notify(hit):
+    for fn in _listeners:
+        fn(hit)
+
+
+class LRUCache:
+    def __init__(self, maxsize=64, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = hold_across_fork(threading.Lock())
+
+    def get(self, key, default=None):
+        hit = False
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires, value = item
+                if expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    hit = True
+                else:
+                    del self._data[key]
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if _listeners:
+            _notify(hit)
+        return value if hit else default
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_build(self, key, build):
+        """Return the cached value for `key`, building (outside the lock) on a miss."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = build()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
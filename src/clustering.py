@@ -0,0 +1,180 @@
+"""
+Streaming tower clustering, promoted from data/Clustering.ipynb.
+
+The notebook scaled and clustered the whole frame in memory. Here the scaler
+and the mini-batch KMeans are both fitted chunk by chunk, k is picked with a
+silhouette score on a small reservoir sample, and the centroids are saved so
+the dashboard only has to assign clusters (no refit at request time).
+
+Run directly to (re)fit and save the centroids:
+
+    python src/clustering.py
+"""
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from feature_store import FEATURE_COLS, load_feature_store
+from paths import FINAL_PATH
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = FINAL_PATH
+CLUSTER_PATH = os.path.join(BASE_DIR, "..", "model", "tower_clusters.npz")
+
+CHUNK_SIZE = 2000           # rows read per chunk
+SAMPLE_SIZE = 3000          # reservoir size used to choose k
+K_CANDIDATES = range(2, 9)  # the notebook used a fixed k=3
+ASSIGN_BATCH = 65536        # rows per vectorized assignment batch
+RANDOM_STATE = 42
+
+
+def iter_feature_chunks(path=DATA_PATH, chunksize=CHUNK_SIZE):
+    """Yield float32 feature blocks from a CSV without loading it whole."""
+    for chunk in pd.read_csv(path, usecols=FEATURE_COLS, chunksize=chunksize):
+        chunk = chunk.dropna(subset=FEATURE_COLS)
+        if len(chunk):
+            yield chunk[FEATURE_COLS].to_numpy(dtype=np.float32)
+
+
+def _reservoir_update(sample, keys, X, rng, size):
+    # Keep the `size` rows with the smallest random keys seen so far, which
+    # is a uniform sample of the stream regardless of its length.
+    new_keys = rng.random(len(X))
+    sample = X if sample is None else np.vstack([sample, X])
+    keys = new_keys if keys is None else np.concatenate([keys, new_keys])
+    if len(keys) > size:
+        keep = np.argpartition(keys, size)[:size]
+        sample, keys = sample[keep], keys[keep]
+    return sample, keys
+
+
+def choose_k(sample, candidates=K_CANDIDATES, random_state=RANDOM_STATE):
+    """Pick k with the highest silhouette score on an (already scaled) sample."""
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.metrics import silhouette_score
+
+    scores = {}
+    for k in candidates:
+        if k >= len(sample):
+            break
+        labels = MiniBatchKMeans(
+            n_clusters=k, random_state=random_state, n_init=3
+        ).fit_predict(sample)
+        scores[k] = float(silhouette_score(sample, labels, random_state=random_state))
+    best_k = max(scores, key=scores.get)
+    return best_k, scores
+
+
+def fit_clusters(chunks, k=None, random_state=RANDOM_STATE):
+    """
+    Fit scaler + mini-batch KMeans over a re-iterable source of feature chunks.
+
+    `chunks` is a zero-argument callable returning a fresh chunk iterator; it
+    is consumed twice (scaler/sample pass, then KMeans pass).
+    """
+    # sklearn is only needed to fit; the app just assigns with saved centroids
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.preprocessing import StandardScaler
+
+    rng = np.random.default_rng(random_state)
+    scaler = StandardScaler()
+    sample = keys = None
+    n_rows = 0
+    for X in chunks():
+        scaler.partial_fit(X)
+        sample, keys = _reservoir_update(sample, keys, X, rng, SAMPLE_SIZE)
+        n_rows += len(X)
+    if sample is None:
+        raise ValueError("No complete feature rows to cluster")
+
+    sample_scaled = scaler.transform(sample)
+    scores = {}
+    if k is None:
+        k, scores = choose_k(sample_scaled, random_state=random_state)
+
+    kmeans = MiniBatchKMeans(n_clusters=k, random_state=random_state, n_init=3)
+    # Seed the centroids from the sample so small first chunks can't starve k.
+    kmeans.partial_fit(sample_scaled)
+    for X in chunks():
+        kmeans.partial_fit(scaler.transform(X))
+
+    return {
+        "centroids": kmeans.cluster_centers_.astype(np.float32),
+        "mean": scaler.mean_.astype(np.float32),
+        "scale": scaler.scale_.astype(np.float32),
+        "feature_cols": np.array(FEATURE_COLS),
+        "k": k,
+        "n_rows": n_rows,
+        "scores": scores,
+    }
+
+
+def save_clusters(model, path=CLUSTER_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez(
+        path,
+        centroids=model["centroids"],
+        mean=model["mean"],
+        scale=model["scale"],
+        feature_cols=model["feature_cols"],
+    )
+
+
+def load_clusters(path=CLUSTER_PATH):
+    """Load saved centroids, or None if missing / fitted on other features."""
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as f:
+        model = {name: f[name] for name in f.files}
+    if list(model["feature_cols"]) != FEATURE_COLS:
+        return None
+    model["k"] = len(model["centroids"])
+    return model
+
+
+def load_or_fit_clusters(store=None, path=CLUSTER_PATH, data_path=DATA_PATH):
+    """
+    Load the persisted centroids, fitting (once) if absent. Fitting streams
+    row slices of the shared feature store when given, else CSV chunks.
+    """
+    model = load_clusters(path)
+    if model is None:
+        if store is not None:
+            model = fit_clusters(lambda: store.iter_chunks(FEATURE_COLS, CHUNK_SIZE))
+        else:
+            model = fit_clusters(lambda: iter_feature_chunks(data_path))
+        save_clusters(model, path)
+    return model
+
+
+def assign_clusters(X, model, batch_size=ASSIGN_BATCH):
+    """
+    Nearest-centroid labels for a (rows x FEATURE_COLS) array, in batches.
+
+    Rows with missing values get -1.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    centroids = model["centroids"]
+    c_sq = (centroids ** 2).sum(axis=1)
+    labels = np.full(len(X), -1, dtype=np.int32)
+    for start in range(0, len(X), batch_size):
+        xb = (X[start:start + batch_size] - model["mean"]) / model["scale"]
+        # ||x - c||^2 without the per-row ||x||^2 term, which doesn't change argmin
+        dist = c_sq - 2.0 * (xb @ centroids.T)
+        batch_labels = dist.argmin(axis=1).astype(np.int32)
+        batch_labels[np.isnan(xb).any(axis=1)] = -1
+        labels[start:start + batch_size] = batch_labels
+    return labels
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    store = load_feature_store(source_path=DATA_PATH)
+    model = fit_clusters(lambda: store.iter_chunks(FEATURE_COLS, CHUNK_SIZE))
+    save_clusters(model)
+    print(f"Fitted k={model['k']} on {model['n_rows']} rows in {time.perf_counter() - start:.2f}s")
+    for k, score in model["scores"].items():
+        print(f"  k={k}: silhouette={score:.4f}")
+    print(f"Centroids saved to {os.path.abspath(CLUSTER_PATH)}")
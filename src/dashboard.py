@@ -6,21 +6,42 @@ import plotly.express as px
 import base64
 import io
 import os
+import threading
+
+from background import make_manager
+from forecasting import HORIZON, load_forecasts
+from tower_state import TowerState
+from tower_table import TABLE_COLS, TowerTable
 
 # Initialize the Dash app
 app = dash.Dash(__name__)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_PATH = os.path.join(BASE_DIR, "../data/cleaned_network_data.csv")
 
+
+def data_version():
+    # Cached graph results are dropped when the CSV changes
+    st = os.stat(DATA_PATH)
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
+
+# Graph rebuilds run in a background process; identical filter selections
+# are answered from the disk cache
+manager = make_manager("dashboard", [data_version])
+
 # --- Data Loading and Preprocessing ---
-try:
-    # Read the CSV file directly from the local file system.
-    df = pd.read_csv(DATA_PATH)
-except Exception as e:
-    print(f"Error reading CSV file. Please make sure 'cleaned_network_data.csv' is in the same directory as this script. Error: {e}")
-    df = pd.DataFrame() # Create an empty DataFrame if an error occurs
+numeric_cols = [
+    'latency_sec', 'bandwidth_mbps', 'dropped_calls', 'total_calls', 'download_speed_mbps',
+    'signal_strength_dbm', 'tower_load_percent', 'average_call_duration_sec',
+    'handover_success_rate', 'packet_loss_percent', 'jitter_ms', 'tower_temperature_c',
+    'battery_backup_hours', 'tower_age_years', 'upload_speed_mbps', 'location.latitude',
+    'location.longitude', 'signal_strength.RSRP', 'signal_strength.SINR',
+    'voip_metrics.jitter_ms', 'voip_metrics.packet_loss_percent', 'tower_height_m',
+    'call_drop_rate'
+]
 
-if not df.empty:
+
+def prepare(df):
     # Clean the column names to remove leading/trailing spaces
     df.columns = df.columns.str.strip()
 
@@ -29,38 +50,119 @@ if not df.empty:
     df['timestamp'] = pd.to_datetime(df['timestamp'])
 
     # Convert numeric columns, handling potential errors
-    numeric_cols = [
-        'latency_sec', 'bandwidth_mbps', 'dropped_calls', 'total_calls', 'download_speed_mbps',
-        'signal_strength_dbm', 'tower_load_percent', 'average_call_duration_sec',
-        'handover_success_rate', 'packet_loss_percent', 'jitter_ms', 'tower_temperature_c',
-        'battery_backup_hours', 'tower_age_years', 'upload_speed_mbps', 'location.latitude',
-        'location.longitude', 'signal_strength.RSRP', 'signal_strength.SINR',
-        'voip_metrics.jitter_ms', 'voip_metrics.packet_loss_percent', 'tower_height_m',
-        'call_drop_rate'
-    ]
     for col in numeric_cols:
         df[col] = pd.to_numeric(df[col], errors='coerce')
-    
+
     # Calculate 'call_drop_rate' if it's not present or if 'total_calls' is not zero
     if 'call_drop_rate' not in df.columns or df['call_drop_rate'].isnull().all():
         df['call_drop_rate'] = df.apply(
             lambda row: (row['dropped_calls'] / row['total_calls']) * 100 if row['total_calls'] > 0 else 0,
             axis=1
         )
+    return df
+
+
+# Rows appended after csv_offset are read incrementally. The file's inode and
+# the bytes just before the offset tell an append from a rewrite (the pipeline
+# replaces or rewrites the CSV), which is reloaded from scratch.
+CSV_TAIL_BYTES = 256
+
+
+def read_csv():
+    """The whole CSV (complete lines only); resets the state appends are read from."""
+    global csv_header, csv_offset, csv_ino, csv_tail
+    with open(DATA_PATH, 'rb') as f:
+        data = f.read()
+        ino = os.fstat(f.fileno()).st_ino
+    data = data[:data.rfind(b'\n') + 1]
+    frame = pd.read_csv(io.BytesIO(data))
+    csv_header, csv_offset, csv_ino, csv_tail = list(frame.columns), len(data), ino, data[-CSV_TAIL_BYTES:]
+    return frame
+
+
+try:
+    # Read the CSV file directly from the local file system.
+    df = read_csv()
+except Exception as e:
+    print(f"Error reading CSV file. Please make sure 'cleaned_network_data.csv' is in the same directory as this script. Error: {e}")
+    df = pd.DataFrame() # Create an empty DataFrame if an error occurs
+
+
+# Guards csv_offset: concurrent interval callbacks would otherwise read (and
+# count) the same appended rows twice
+csv_lock = threading.Lock()
+
+
+def csv_rewritten():
+    """Whether the CSV was replaced, truncated or rewritten since the last read; hold csv_lock."""
+    with open(DATA_PATH, 'rb') as f:
+        st = os.fstat(f.fileno())
+        if st.st_ino != csv_ino or st.st_size < csv_offset:
+            return True
+        f.seek(csv_offset - len(csv_tail))
+        return f.read(len(csv_tail)) != csv_tail
+
+
+def read_appended_rows():
+    """Rows appended to the CSV since the last read (complete lines only); hold csv_lock."""
+    global csv_offset, csv_tail
+    if os.path.getsize(DATA_PATH) <= csv_offset:
+        return None
+    with open(DATA_PATH, 'rb') as f:
+        f.seek(csv_offset)
+        chunk = f.read()
+    chunk = chunk[:chunk.rfind(b'\n') + 1]
+    if not chunk:
+        return None
+    csv_offset += len(chunk)
+    csv_tail = (csv_tail + chunk)[-CSV_TAIL_BYTES:]
+    return prepare(pd.read_csv(io.BytesIO(chunk), header=None, names=csv_header))
+
+
+if not df.empty:
+    df = prepare(df)
 
     # Calculate average KPIs for display
     avg_latency = df['latency_sec'].mean()
     avg_call_drop_rate = df['call_drop_rate'].mean()
     avg_bandwidth_mbps = df['bandwidth_mbps'].mean()
 
-    # Get top 10 underperforming towers by call drop rate
-    top_underperforming_towers = df.groupby('tower_id').agg(
-        avg_call_drop_rate=('call_drop_rate', 'mean'),
-        num_dropped_calls=('dropped_calls', 'sum'),
-        total_calls=('total_calls', 'sum')
-    ).sort_values(by='avg_call_drop_rate', ascending=False).head(10).reset_index()
-    # Format the call drop rate to two decimal places
-    top_underperforming_towers['avg_call_drop_rate'] = top_underperforming_towers['avg_call_drop_rate'].round(2)
+    # Per-tower aggregates, updated incrementally as rows are appended
+    towers = TowerTable(df)
+    TABLE_PAGE_SIZE = 15
+
+    # Latest reading + rolling 1h/24h per tower ("what is each tower doing now")
+    def build_fleet(frame):
+        return TowerState(
+            kpi_cols=['latency_sec', 'call_drop_rate', 'bandwidth_mbps', 'dropped_calls', 'total_calls'],
+            flag_col=None,
+        ).seed(frame)
+
+    fleet = build_fleet(df)
+    FLEET_COLS = [
+        'tower_id', 'timestamp', 'operator', 'network_type', 'latency_sec', 'call_drop_rate',
+        'readings_1h', 'call_drop_rate_1h', 'readings_24h', 'call_drop_rate_24h', 'latency_sec_24h'
+    ]
+
+    # Load forecasts written by `python src/forecasting.py` (or the pipeline)
+    forecasts = load_forecasts()
+    FORECAST_COLS = ['tower_id', 'target', 'peak_forecast', 'peak_at', 'threshold']
+
+    def sync_new_rows():
+        # Every view that tracks the CSV gets the appended rows exactly once,
+        # and in file order (the lock covers the read and the updates)
+        global df, towers, fleet
+        with csv_lock:
+            if csv_rewritten():
+                # Not an append: rebuild every view from the new file
+                df = prepare(read_csv())
+                towers = TowerTable(df)
+                fleet = build_fleet(df)
+                return
+            new_rows = read_appended_rows()
+            if new_rows is not None:
+                towers.update(new_rows)
+                fleet.update_frame(new_rows)
 
     # --- Dashboard Layout ---
     app.layout = html.Div(
@@ -138,15 +240,64 @@ if not df.empty:
                 ]
             ),
             
+            # Current Fleet Status (latest reading per tower)
+            html.Div(
+                style={'background-color': '#fff', 'padding': '20px', 'border-radius': '10px', 'box-shadow': '0 4px 6px rgba(0, 0, 0, 0.1)', 'margin-top': '20px'},
+                children=[
+                    html.H2("Current Fleet Status", style={'color': '#555', 'font-size': '1.2rem', 'text-align': 'center'}),
+                    dash_table.DataTable(
+                        id='fleet-status-table',
+                        columns=[{"name": i, "id": i} for i in FLEET_COLS],
+                        page_size=TABLE_PAGE_SIZE,
+                        sort_action='native',
+                        style_header={
+                            'backgroundColor': 'rgb(230, 230, 230)',
+                            'fontWeight': 'bold'
+                        },
+                        style_cell={'textAlign': 'left'}
+                    )
+                ]
+            ),
+
+            # Towers forecast to hit high load
+            html.Div(
+                style={'background-color': '#fff', 'padding': '20px', 'border-radius': '10px', 'box-shadow': '0 4px 6px rgba(0, 0, 0, 0.1)', 'margin-top': '20px'},
+                children=[
+                    html.H2(f"Expected High Load (next {HORIZON}h)", style={'color': '#555', 'font-size': '1.2rem', 'text-align': 'center'}),
+                    html.P(
+                        "No forecasts yet: run python src/forecasting.py" if forecasts is None else "",
+                        style={'text-align': 'center', 'color': '#888'}
+                    ),
+                    dash_table.DataTable(
+                        id='load-forecast-table',
+                        columns=[{"name": i, "id": i} for i in FORECAST_COLS],
+                        page_size=TABLE_PAGE_SIZE,
+                        sort_action='native',
+                        style_header={
+                            'backgroundColor': 'rgb(230, 230, 230)',
+                            'fontWeight': 'bold'
+                        },
+                        style_cell={'textAlign': 'left'}
+                    )
+                ]
+            ),
+
             # Top Underperforming Towers Table
             html.Div(
                 style={'background-color': '#fff', 'padding': '20px', 'border-radius': '10px', 'box-shadow': '0 4px 6px rgba(0, 0, 0, 0.1)', 'margin-top': '20px'},
                 children=[
-                    html.H2("Top 10 Underperforming Towers", style={'color': '#555', 'font-size': '1.2rem', 'text-align': 'center'}),
+                    html.H2("Underperforming Towers", style={'color': '#555', 'font-size': '1.2rem', 'text-align': 'center'}),
                     dash_table.DataTable(
                         id='top-towers-table',
-                        columns=[{"name": i, "id": i} for i in top_underperforming_towers.columns],
-                        data=top_underperforming_towers.to_dict('records'),
+                        columns=[{"name": i, "id": i} for i in TABLE_COLS],
+                        page_current=0,
+                        page_size=TABLE_PAGE_SIZE,
+                        page_action='custom',
+                        sort_action='custom',
+                        sort_mode='single',
+                        sort_by=[{'column_id': 'avg_call_drop_rate', 'direction': 'desc'}],
+                        filter_action='custom',
+                        filter_query='',
                         style_header={
                             'backgroundColor': 'rgb(230, 230, 230)',
                             'fontWeight': 'bold'
@@ -159,12 +310,67 @@ if not df.empty:
     )
 
     # --- Callbacks ---
+    # Tower table: paging, sorting and filtering happen here, one page at a time
+    @app.callback(
+        [Output('top-towers-table', 'data'),
+         Output('top-towers-table', 'page_count')],
+        [Input('top-towers-table', 'page_current'),
+         Input('top-towers-table', 'page_size'),
+         Input('top-towers-table', 'sort_by'),
+         Input('top-towers-table', 'filter_query'),
+         Input('operator-dropdown', 'value'),
+         Input('network-type-dropdown', 'value')]
+    )
+    def update_table(page_current, page_size, sort_by, filter_query, selected_operators, selected_network_types):
+        sync_new_rows()
+        return towers.page(
+            selected_operators, selected_network_types,
+            page_current or 0, page_size or TABLE_PAGE_SIZE, sort_by, filter_query
+        )
+
+    # Fleet status: one row per tower from the materialized view, O(towers)
+    @app.callback(
+        Output('fleet-status-table', 'data'),
+        [Input('operator-dropdown', 'value'),
+         Input('network-type-dropdown', 'value')]
+    )
+    def update_fleet_status(selected_operators, selected_network_types):
+        sync_new_rows()
+        status = fleet.snapshot(selected_operators, selected_network_types)
+        if status.empty:
+            return []
+        status['timestamp'] = status['timestamp'].dt.strftime('%Y-%m-%d %H:%M')
+        return status[FLEET_COLS].round(3).to_dict('records')
+
+    # Forecast table: peak forecast per tower/target where it crosses the threshold
+    @app.callback(
+        Output('load-forecast-table', 'data'),
+        [Input('operator-dropdown', 'value'),
+         Input('network-type-dropdown', 'value')]
+    )
+    def update_forecast_table(selected_operators, selected_network_types):
+        if forecasts is None:
+            return []
+        high = forecasts[forecasts['high']]
+        # Filter on the operator / network type stored with the forecasts,
+        # i.e. from the same rows the forecasts were built from
+        if selected_operators:
+            high = high[high['operator'].isin(selected_operators)]
+        if selected_network_types:
+            high = high[high['network_type'].isin(selected_network_types)]
+        peaks = high.loc[high.groupby(['tower_id', 'target'])['forecast'].idxmax()]
+        peaks = peaks.rename(columns={'forecast': 'peak_forecast', 'timestamp': 'peak_at'})
+        peaks['peak_at'] = peaks['peak_at'].dt.strftime('%Y-%m-%d %H:%M')
+        return peaks.sort_values('peak_forecast', ascending=False)[FORECAST_COLS].round(1).to_dict('records')
+
     # Callback to update all visualizations based on dropdown filters
     @app.callback(
         [Output('underperforming-regions-map', 'figure'),
          Output('latency-time-series', 'figure')],
         [Input('operator-dropdown', 'value'),
-         Input('network-type-dropdown', 'value')]
+         Input('network-type-dropdown', 'value')],
+        background=True,
+        manager=manager,
     )
     def update_graphs(selected_operators, selected_network_types):
         # Filter the DataFrame based on selections
@@ -0,0 +1,21 @@
+"""
+The data/ scripts (synthetic generator and cleaner) as importable modules.
+
+They live outside src/ and are not a package, so they are loaded by path.
+"""
+import importlib.util
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "..", "data")
+
+
+def _load_script(path, name):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+generator = _load_script(os.path.join(DATA_DIR, "main.py"), "data_generator")
+cleaner = _load_script(os.path.join(DATA_DIR, "clean_data.py"), "data_cleaner")
@@ -0,0 +1,218 @@
+"""
+The dataset the app serves: final_data.csv plus appended day partitions.
+
+The base CSV is parsed once per process. `refresh()` only reads partition
+files it has not seen before (written by ingest.py) and appends them, so
+picking up a new 5-minute batch costs that batch, not the history.
+Subscribers get each newly appended frame, which lets rollups stay
+incremental too.
+
+Rows are kept as a list of frames rather than one frame that is re-concatenated
+on every append. Small trailing frames are merged once they rival the one before
+them, so there are only O(log n) frames and each row is copied O(log n) times.
+Filters run frame by frame; the single `frame` is only concatenated when
+something asks for it, and then kept until the next append.
+"""
+import glob
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from cache import LRUCache
+from clustering import assign_clusters, load_or_fit_clusters
+from feature_store import load_feature_store
+from ingest import PARTITION_DIR
+from paths import FINAL_PATH
+from startup import hold_across_fork, timed
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+REFRESH_INTERVAL = 5.0  # seconds between partition directory scans
+EXPORT_CHUNK_ROWS = 50_000  # rows filtered / encoded at a time when exporting
+
+
+def _norm_date(value):
+    return pd.Timestamp(value).isoformat() if value else None
+
+
+def normalize_filters(operators=None, network_types=None, start_date=None, end_date=None):
+    """
+    Canonical, JSON-able filter state: order-insensitive lists and ISO dates,
+    so equivalent selections share one cache key.
+    """
+    return {
+        "operators": sorted(operators or []),
+        "network_types": sorted(network_types or []),
+        "start": _norm_date(start_date),
+        "end": _norm_date(end_date),
+    }
+
+
+def filter_key(filters):
+    return json.dumps(filters, sort_keys=True)
+
+
+class Dataset:
+    def __init__(self, base_path=FINAL_PATH, partition_dir=PARTITION_DIR):
+        self.base_path = base_path
+        self.partition_dir = partition_dir
+        self.version = 0
+        self._lock = hold_across_fork(threading.RLock())   # background jobs fork while ingest appends
+        self._seen = set()
+        self._listeners = []
+        self._last_scan = 0.0
+        self._filtered = LRUCache(maxsize=16, ttl=600)
+        self._parts = [self._load_base()]
+        self._rows = len(self._parts[0])
+        self.refresh(min_interval=0)
+
+    def _load_base(self):
+        df = pd.read_csv(self.base_path, parse_dates=["timestamp"])
+        # Cluster labels from the persisted centroids (fitted once, see clustering.py)
+        store = load_feature_store(df, self.base_path)
+        df["cluster"] = assign_clusters(store.features, load_or_fit_clusters(store))
+        self.store = store
+        return df
+
+    @property
+    def fingerprint(self):
+        """Identifies the loaded data (base file + partition files), stable across workers."""
+        st = os.stat(self.base_path)
+        return f"{st.st_size}-{st.st_mtime_ns}-{len(self._seen)}"
+
+    def subscribe(self, fn, seed=None):
+        """
+        Call `fn(new_rows)` for every frame appended from now on. With `seed`,
+        `seed(frame)` is called first (and its result returned) under the same
+        lock, so a rollup built from the current rows and kept up to date by
+        `fn` neither misses nor double-counts an append.
+        """
+        with self._lock:
+            result = seed(self.frame) if seed is not None else None
+            self._listeners.append(fn)
+        return result
+
+    @property
+    def frame(self):
+        """All rows as one DataFrame (concatenated on first use after an append)."""
+        with self._lock:
+            if len(self._parts) > 1:
+                self._parts = [pd.concat(self._parts)]
+            return self._parts[0]
+
+    @property
+    def columns(self):
+        return self._parts[0].columns
+
+    def parts(self):
+        """The frames that make up the data, in row order (a consistent snapshot)."""
+        with self._lock:
+            return list(self._parts)
+
+    def unique(self, column):
+        """Distinct values of `column`, in order of first appearance."""
+        return pd.unique(pd.concat([part[column].drop_duplicates() for part in self.parts()]))
+
+    def time_range(self):
+        parts = self.parts()
+        return min(p["timestamp"].min() for p in parts), max(p["timestamp"].max() for p in parts)
+
+    def feature_block(self, cols, rows):
+        """
+        float32 (rows x cols) block from the base file's feature store for the
+        row labels `rows`: a zero-copy view for a contiguous run of rows
+        (e.g. unfiltered data), a gather otherwise. None if a row was appended
+        after the base file and so isn't in the store; callers then copy the
+        columns from the frame.
+        """
+        n = len(self.store)
+        if len(rows) == 0 or rows.max() >= n:
+            return None
+        if isinstance(rows, pd.RangeIndex) and rows.step == 1:
+            return self.store.view(cols)[rows.start:rows.stop]
+        return self.store.view(cols)[np.asarray(rows)]
+
+    def append(self, new):
+        with self._lock:
+            # Row labels continue from the previous frames, as one frame would
+            new = new.set_axis(pd.RangeIndex(self._rows, self._rows + len(new)))
+            self._rows += len(new)
+            parts = self._parts + [new]
+            while len(parts) > 1 and len(parts[-2]) <= 2 * len(parts[-1]):
+                parts[-2:] = [pd.concat(parts[-2:])]
+            self._parts = parts
+            self.version += 1
+            listeners = list(self._listeners)
+        for fn in listeners:
+            fn(new)
+
+    def filter(self, filters):
+        """Rows matching normalized `filters`, memoized per data version."""
+        with self._lock:
+            parts, version = list(self._parts), self.version
+        return self._filtered.get_or_build(
+            (filter_key(filters), version), lambda: self._apply_parts(parts, filters)
+        )
+
+    def iter_filtered(self, filters, columns=None, chunk_rows=EXPORT_CHUNK_ROWS):
+        """
+        Yield the rows matching `filters` in row chunks, filtering each chunk on
+        its own so the full filtered subset is never built (for exports).
+        """
+        for frame in self.parts():
+            for start in range(0, len(frame), chunk_rows):
+                chunk = self._apply(frame.iloc[start:start + chunk_rows], filters)
+                if len(chunk):
+                    yield chunk if columns is None else chunk[columns]
+
+    @classmethod
+    def _apply_parts(cls, parts, filters):
+        if len(parts) == 1:
+            return cls._apply(parts[0], filters)
+        return pd.concat([cls._apply(part, filters) for part in parts])
+
+    @staticmethod
+    def _apply(dff, filters):
+        if filters.get("operators"):
+            dff = dff[dff["operator"].isin(filters["operators"])]
+        if filters.get("network_types"):
+            dff = dff[dff["network_type"].isin(filters["network_types"])]
+        if filters.get("start"):
+            dff = dff[dff["timestamp"] >= filters["start"]]
+        if filters.get("end"):
+            dff = dff[dff["timestamp"] <= filters["end"]]
+        return dff
+
+    def refresh(self, min_interval=REFRESH_INTERVAL):
+        """Append partition files written since the last scan; returns their paths."""
+        now = time.monotonic()
+        if now - self._last_scan < min_interval:
+            return []
+        with self._lock:
+            self._last_scan = now
+            pattern = os.path.join(self.partition_dir, "date=*", "*.parquet")
+            new_paths = sorted(set(glob.glob(pattern)) - self._seen)
+            if not new_paths:
+                return []
+            new = pd.concat([pd.read_parquet(p) for p in new_paths], ignore_index=True)
+            self._seen.update(new_paths)
+            self.append(new)
+        return new_paths
+
+
+_dataset = None
+_dataset_lock = threading.Lock()
+
+
+def get_dataset():
+    """Process-wide Dataset, loaded on first use."""
+    global _dataset
+    with _dataset_lock:
+        if _dataset is None:
+            with timed("dataset"):
+                _dataset = Dataset()
+    return _dataset
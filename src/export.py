@@ -0,0 +1,71 @@
+"""
+Chunked CSV / Parquet encoders for streaming exports.
+
+Both take an iterator of DataFrame chunks and yield bytes as each chunk is
+encoded, so memory stays at one chunk whatever the export size. Parquet is
+written one row group per chunk through a sink that hands back what the
+writer produced so far.
+"""
+import io
+
+import pyarrow as pa  # type: ignore
+import pyarrow.csv as pa_csv  # type: ignore
+import pyarrow.parquet as pq  # type: ignore
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def iter_csv(chunks):
+    # Arrow's CSV writer is several times faster than DataFrame.to_csv per chunk
+    header = True
+    for chunk in chunks:
+        buf = io.BytesIO()
+        options = pa_csv.WriteOptions(include_header=header, quoting_style="needed")
+        pa_csv.write_csv(pa.Table.from_pandas(chunk, preserve_index=False), buf, options)
+        yield buf.getvalue()
+        header = False
+
+
+class _DrainSink(io.RawIOBase):
+    # Write-only file object whose contents are taken out after every write
+    def __init__(self):
+        self._parts = []
+        self._pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def drain(self):
+        out = b"".join(self._parts)
+        self._parts = []
+        return out
+
+
+def iter_parquet(chunks):
+    sink = _DrainSink()
+    writer = schema = None
+    for chunk in chunks:
+        if writer is None:
+            # The first chunk fixes the schema; later chunks are cast to it
+            schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+            writer = pq.ParquetWriter(sink, schema)
+        writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+def encode(chunks, fmt):
+    return iter_parquet(chunks) if fmt == "parquet" else iter_csv(chunks)
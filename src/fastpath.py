@@ -0,0 +1,175 @@
+"""
+Opt-in fast path for callback responses (FAST_PATH=1, see app.py).
+
+- Figures are packed once when built: object arrays (mixed hover data) become
+  plain lists so orjson serializes them without Plotly's slow cleaning pass,
+  and float64 x / y (the plotted values only) are sent as float32 typed
+  arrays, half the base64 size. customdata is left at full precision: it is
+  what click-through hands to page2.
+- Callback payloads are encoded with orjson (if the `orjson` package is
+  installed; otherwise Plotly's default encoder is kept).
+- Responses above COMPRESS_MIN_BYTES are compressed with brotli (if the
+  `brotli` package is installed and the client accepts it) or gzip.
+
+    python src/fastpath.py      # bytes on wire / serialization time, off vs on
+"""
+import base64
+import gzip
+import logging
+import time
+
+import numpy as np
+import plotly.io.json as pio_json  # type: ignore
+
+try:
+    import brotli  # type: ignore
+except ImportError:
+    brotli = None
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
+log = logging.getLogger("fastpath")
+
+COMPRESS_MIN_BYTES = 1024   # smaller responses aren't worth the CPU
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4          # fast levels; payloads are regenerated per request
+PACKED_KEYS = ("x", "y")   # float64 arrays sent as float32
+JSON_ENGINE = "orjson" if orjson is not None else "auto"
+COMPRESSIBLE = ("application/json", "text/html", "text/css", "application/javascript", "text/plain")
+
+_enabled = False
+
+
+def enabled():
+    return _enabled
+
+
+def _typed(arr):
+    # Plotly.js typed-array spec: {"dtype", "bdata"(, "shape")}
+    spec = {"dtype": arr.dtype.str[1:], "bdata": base64.b64encode(arr.tobytes()).decode("ascii")}
+    if arr.ndim > 1:
+        spec["shape"] = ", ".join(str(n) for n in arr.shape)
+    return spec
+
+
+def _untyped(spec):
+    arr = np.frombuffer(base64.b64decode(spec["bdata"]), dtype=spec["dtype"])
+    if "shape" in spec:
+        arr = arr.reshape([int(n) for n in spec["shape"].split(",")])
+    return arr
+
+
+def pack_trace(trace):
+    out = {}
+    for key, value in trace.items():
+        if isinstance(value, np.ndarray) and value.dtype == object:
+            value = value.tolist()
+        elif key in PACKED_KEYS and isinstance(value, dict) and value.get("dtype") == "f8":
+            value = _typed(_untyped(value).astype(np.float32))
+        elif key in PACKED_KEYS and isinstance(value, np.ndarray) and value.dtype == np.float64:
+            value = _typed(value.astype(np.float32))
+        out[key] = value
+    return out
+
+
+def pack_figure(fig):
+    """Copy of a plotly json dict ready for the fast serializer (no-op when disabled)."""
+    if not _enabled:
+        return fig
+    return dict(fig, data=[pack_trace(trace) for trace in fig["data"]])
+
+
+# -------------------
+# Response compression
+# -------------------
+def _encoding(accept):
+    if brotli is not None and "br" in accept:
+        return "br"
+    if "gzip" in accept:
+        return "gzip"
+    return None
+
+
+def compress_response(response):
+    if (
+        response.direct_passthrough
+        or response.is_streamed  # chunked NDJSON is sent as it is produced
+        or response.status_code != 200
+        or "Content-Encoding" in response.headers
+        or not response.mimetype.startswith(COMPRESSIBLE)
+    ):
+        return response
+    from flask import request
+    encoding = _encoding(request.headers.get("Accept-Encoding", ""))
+    body = response.get_data()
+    if encoding is None or len(body) < COMPRESS_MIN_BYTES:
+        return response
+    if encoding == "br":
+        body = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    response.headers["Content-Length"] = str(len(body))
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def enable(app):
+    """Turn the fast path on for this process and compress `app.server` responses."""
+    global _enabled
+    _enabled = True
+    if orjson is None:
+        log.warning("orjson is not installed; keeping Plotly's default JSON encoder")
+    pio_json.config.default_engine = JSON_ENGINE
+    app.server.after_request(compress_response)
+
+
+# -------------------
+# Before / after measurement
+# -------------------
+def _measure(obj, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        body = pio_json.to_json_plotly(obj).encode()
+        best = min(best, time.perf_counter() - t)
+    wire = len(body)
+    if _enabled and wire >= COMPRESS_MIN_BYTES:
+        wire = len(brotli.compress(body, quality=BROTLI_QUALITY) if brotli else gzip.compress(body, GZIP_LEVEL))
+    return best, len(body), wire
+
+
+def benchmark():
+    """Serialize each page1 callback's output with the fast path off, then on."""
+    global _enabled
+    import app as dash_app  # noqa: F401  (registers the pages)
+    import sys
+    from dataset import normalize_filters
+
+    page1 = sys.modules["pages.page1"]
+    filters = normalize_filters()
+    outputs = {
+        "trends": lambda: page1.update_latency(lambda _: None, filters, "dark", [])[:3],
+        "anomaly_scatter": lambda: page1.update_anomaly(filters, theme_class="dark"),
+        "geo_map": lambda: page1.update_geo(filters, "dark"),
+        "filtered-data": lambda: page1.filter_and_store(None, None, None, None),
+    }
+    print(f"{'callback':<16}{'mode':<6}{'serialize':>11}{'json bytes':>12}{'on wire':>12}")
+    for name, build in outputs.items():
+        for mode in ("off", "on"):
+            _enabled = mode == "on"
+            pio_json.config.default_engine = JSON_ENGINE if _enabled else "auto"
+            page1.FIGURES.clear()
+            seconds, raw, wire = _measure(build())
+            print(f"{name:<16}{mode:<6}{seconds * 1000:>9.1f}ms{raw:>12,}{wire:>12,}")
+    _enabled = False
+
+
+if __name__ == "__main__":
+    # Go through the imported module so the pages see the same switch
+    import fastpath
+    fastpath.benchmark()
@@ -0,0 +1,183 @@
+"""
+Shared float32 feature matrix.
+
+The 19 model features (plus the two derived anomaly inputs) are materialized
+once per dataset as a C-contiguous float32 .npy file and memory-mapped
+read-only, so every page / worker shares the same pages of memory. A JSON
+sidecar keeps the column index and per-feature stats (min/max/median/mean/std),
+which is all page2 needs to build its input ranges without parsing the CSV.
+
+Both blocks the models read are contiguous column runs, so taking them is a
+zero-copy slice: ANOMALY_COLS (in the order the IsolationForest was trained
+with) is matrix[:, 0:3] and FEATURE_COLS is matrix[:, 3:22]. latency_sec is
+in both, so it is stored twice (one float32 per row) to keep both runs whole.
+Rows are in source file order; see Dataset.feature_block for rows that were
+appended after the file and so have no store (callers copy from the frame).
+"""
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from paths import FINAL_PATH
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = FINAL_PATH
+CACHE_DIR = os.path.join(BASE_DIR, "..", ".cache", "features")
+
+# Feature names must match the model's expected order / names
+FEATURE_COLS = [
+    'latency_sec', 'bandwidth_mbps', 'dropped_calls', 'total_calls',
+    'uptime_percent', 'users_connected', 'download_speed_mbps', 'upload_speed_mbps',
+    'signal_strength.RSSI', 'signal_strength.RSRP', 'signal_strength.SINR',
+    'tower_load_percent', 'average_call_duration_sec', 'handover_success_rate',
+    'packet_loss_percent', 'jitter_ms', 'tower_temperature_c', 'battery_backup_hours',
+    'tower_age_years'
+]
+
+# IsolationForest inputs, in training order (see anomaly_detection_model.py)
+ANOMALY_COLS = ['latency_sec', 'call_drop_rate', 'bandwidth_numeric']
+
+STORE_COLS = ANOMALY_COLS + FEATURE_COLS   # latency_sec twice, see above
+
+CHUNK_ROWS = 65536
+
+_stores = {}
+_lock = threading.Lock()
+
+
+def _column_stats(df, columns):
+    stats = {}
+    for col in columns:
+        s = pd.to_numeric(df[col], errors="coerce")
+        stats[col] = {
+            "min": float(s.min()),
+            "max": float(s.max()),
+            "median": float(s.median()),
+            "mean": float(s.mean()),
+            "std": float(s.std()),
+        }
+    return stats
+
+
+class FeatureStore:
+    """Read-only (rows x columns) float32 matrix with a column index and stats."""
+
+    def __init__(self, matrix, columns, stats):
+        self.matrix = matrix
+        self.columns = list(columns)
+        self.index = {}
+        for i, c in enumerate(self.columns):
+            self.index.setdefault(c, i)
+        self.stats = stats
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    @classmethod
+    def from_frame(cls, df, path=None, columns=STORE_COLS):
+        """
+        Build a store from a DataFrame. With `path` the matrix is written to an
+        .npy file (in row chunks) and reopened as a read-only memmap;
+        otherwise it stays in memory.
+        """
+        stats = _column_stats(df, columns)
+        if path is None:
+            matrix = np.ascontiguousarray(df[columns].to_numpy(dtype=np.float32))
+            return cls(matrix, columns, stats)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+        out = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=np.float32, shape=(len(df), len(columns))
+        )
+        for start in range(0, len(df), CHUNK_ROWS):
+            block = df.iloc[start:start + CHUNK_ROWS]
+            out[start:start + len(block)] = block[columns].to_numpy(dtype=np.float32)
+        out.flush()
+        del out
+        with open(f"{tmp_path}.json", "w") as f:
+            json.dump({"columns": list(columns), "stats": stats}, f)
+        # Publish atomically so concurrent workers never see a half-written file
+        os.replace(f"{tmp_path}.json", f"{path}.json")
+        os.replace(tmp_path, path)
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path):
+        with open(f"{path}.json") as f:
+            meta = json.load(f)
+        matrix = np.load(path, mmap_mode="r")
+        return cls(matrix, meta["columns"], meta["stats"])
+
+    def column(self, name):
+        """Zero-copy (strided) view of one feature."""
+        return self.matrix[:, self.index[name]]
+
+    def view(self, cols):
+        """
+        2D block for `cols`. A run of stored columns in that order
+        (ANOMALY_COLS, FEATURE_COLS) is returned as a view; any other
+        selection is gathered into a copy.
+        """
+        cols = list(cols)
+        for start, name in enumerate(self.columns):
+            if name == cols[0] and self.columns[start:start + len(cols)] == cols:
+                return self.matrix[:, start:start + len(cols)]
+        return self.matrix[:, [self.index[c] for c in cols]]
+
+    @property
+    def features(self):
+        return self.view(FEATURE_COLS)
+
+    def iter_chunks(self, cols=FEATURE_COLS, chunk_rows=CHUNK_ROWS, dropna=True):
+        """Yield row slices of `cols` (views unless rows have to be dropped)."""
+        block = self.view(cols)
+        for start in range(0, len(block), chunk_rows):
+            X = block[start:start + chunk_rows]
+            if dropna:
+                missing = np.isnan(X).any(axis=1)
+                if missing.any():
+                    X = X[~missing]
+            if len(X):
+                yield X
+
+    def ranges(self, cols=FEATURE_COLS):
+        """{col: (min, max, median)} for building input widgets."""
+        return {
+            c: (self.stats[c]["min"], self.stats[c]["max"], self.stats[c]["median"])
+            for c in cols if c in self.stats
+        }
+
+
+def _cache_path(source_path):
+    st = os.stat(source_path)
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    # The column layout is part of the name, so a store in an older layout is rebuilt
+    layout = hashlib.sha1(",".join(STORE_COLS).encode()).hexdigest()[:8]
+    return os.path.join(CACHE_DIR, f"{name}-{st.st_size}-{st.st_mtime_ns}-{layout}.f32.npy")
+
+
+def load_feature_store(df=None, source_path=DATA_PATH):
+    """
+    Shared store for a source CSV, keyed by its size/mtime.
+
+    The first caller in a process opens (or builds) the memmap; everyone else
+    gets the same object. `df` is only used when the cache has to be built,
+    and must hold the rows of `source_path` in file order.
+    """
+    path = _cache_path(source_path)
+    with _lock:
+        store = _stores.get(path)
+        if store is None:
+            if os.path.exists(path) and os.path.exists(f"{path}.json"):
+                store = FeatureStore.open(path)
+            else:
+                if df is None:
+                    df = pd.read_csv(source_path, usecols=list(dict.fromkeys(STORE_COLS)))
+                store = FeatureStore.from_frame(df, path)
+            _stores[path] = store
+    return store
@@ -0,0 +1,277 @@
+"""
+Fleet-wide load forecasting with seasonal exponential smoothing.
+
+Per-tower series are resampled onto one (towers x time) matrix and an
+additive Holt-Winters model is run over every tower at once: the recursion
+loops over time steps only, each step is a NumPy operation across all towers.
+Smoothing parameters are chosen per tower from a small grid by running all
+(tower, parameter) combinations side by side and keeping the one with the
+lowest one-step-ahead error.
+
+The fitted state (level, trend, seasonal profile) is saved to
+model/forecast_state.npz. It covers every hour but the newest, which may
+still be filling up; the forecast folds that hour into a copy. On the next
+run, if the saved hours are unchanged (same towers, same start, same values:
+rows were only appended), only the new hours are folded in with `update()`
+instead of refitting. Anything else (regenerated data, new towers) refits.
+With less than a season of hours the model is fitted without the seasonal
+term (Holt's linear trend), and refitted seasonally once a season is in.
+Forecasts for the next hours are written to model/tower_forecasts.parquet
+for the dashboard.
+
+    python src/forecasting.py
+"""
+import hashlib
+import itertools
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from paths import FINAL_PATH
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = FINAL_PATH
+FORECAST_PATH = os.path.join(BASE_DIR, "..", "model", "tower_forecasts.parquet")
+STATE_PATH = os.path.join(BASE_DIR, "..", "model", "forecast_state.npz")
+
+TARGETS = ["tower_load_percent", "users_connected"]
+INFO_COLS = ["operator", "network_type"]   # per tower, from the same rows, for filtering
+FREQ = "1h"               # matrix resolution
+SEASON = 24               # daily seasonality at hourly resolution
+HORIZON = 6               # hours ahead
+HIGH_LOAD = {"tower_load_percent": 85.0}   # fixed thresholds; others use the p90 below
+BOUNDS = {"tower_load_percent": (0, 100), "users_connected": (0, None)}   # forecasts are clipped to these
+HIGH_QUANTILE = 0.9
+
+ALPHAS = (0.1, 0.3, 0.6)  # level
+BETAS = (0.0, 0.05)       # trend
+GAMMAS = (0.05, 0.2)      # season
+GRID = np.array(list(itertools.product(ALPHAS, BETAS, GAMMAS)))
+TREND_GRID = np.array(list(itertools.product(ALPHAS, BETAS, (0.0,))))   # no seasonal term
+
+
+def tower_matrix(df, col, freq=FREQ):
+    """
+    (towers x time) float matrix of `col` averaged per `freq` bucket.
+
+    Gaps are carried forward (then back, for a tower's leading gap); a tower
+    with no readings at all gets the fleet mean.
+    """
+    buckets = df["timestamp"].dt.floor(freq)
+    wide = df.groupby(["tower_id", buckets])[col].mean().unstack("timestamp")
+    index = pd.date_range(buckets.min(), buckets.max(), freq=freq)
+    wide = wide.reindex(columns=index).ffill(axis=1).bfill(axis=1)
+    wide = wide.fillna(df[col].mean())
+    return wide.index.to_numpy(), index, wide.to_numpy(dtype=np.float64)
+
+
+def _init_state(Y, season):
+    # Seasonal profiles are kept time-major, (season x towers), so each step
+    # reads and writes one contiguous row
+    n_seasons = Y.shape[1] // season
+    first = Y[:, :season]
+    level = first.mean(axis=1)
+    if n_seasons >= 2:
+        trend = (Y[:, season:2 * season].mean(axis=1) - level) / season
+    else:
+        trend = np.zeros(len(Y))
+    seasonal = np.ascontiguousarray((first - level[:, None]).T)
+    return level, trend, seasonal
+
+
+def _smooth(YT, alpha, beta, gamma, season, level, trend, seasonal, start=0, rows=None):
+    """
+    Run the additive Holt-Winters recursion over time-major observations
+    `YT` (time x towers), updating the state in place. `rows` maps state
+    columns to towers when several parameter sets share one tower.
+    Returns the summed squared one-step error per state column.
+    """
+    sse = np.zeros(len(level))
+    for t in range(len(YT)):
+        s = (start + t) % season
+        y = YT[t] if rows is None else YT[t][rows]
+        prev_season = seasonal[s].copy()
+        err = y - (level + trend + prev_season)
+        if start + t >= season:  # the first season only initialises
+            sse += err * err
+        new_level = alpha * (y - prev_season) + (1 - alpha) * (level + trend)
+        trend[:] = beta * (new_level - level) + (1 - beta) * trend
+        seasonal[s] = gamma * (y - new_level) + (1 - gamma) * prev_season
+        level[:] = new_level
+    return sse
+
+
+def fit(Y, season=SEASON, grid=GRID):
+    """
+    Fit every row of `Y` (towers x time) at once. Each tower gets one state
+    column per grid point, the recursion runs over the whole (towers * grid)
+    block, and the best parameters per tower are kept with their final state.
+    """
+    n, g = len(Y), len(grid)
+    level, trend, seasonal = _init_state(Y, season)
+    rows = np.repeat(np.arange(n), g)             # state column -> tower
+    params = np.tile(grid, (n, 1))                # state column -> (alpha, beta, gamma)
+    level, trend, seasonal = level[rows], trend[rows], seasonal[:, rows]
+    YT = np.ascontiguousarray(Y.T)
+    sse = _smooth(YT, params[:, 0], params[:, 1], params[:, 2], season,
+                  level, trend, seasonal, rows=rows)
+
+    best = np.arange(n) * g + sse.reshape(n, g).argmin(axis=1)
+    return {
+        "alpha": params[best, 0], "beta": params[best, 1], "gamma": params[best, 2],
+        "level": level[best], "trend": trend[best], "seasonal": seasonal[:, best],
+        "steps": Y.shape[1], "season": season,
+        "rmse": np.sqrt(sse[best] / max(Y.shape[1] - season, 1)),
+    }
+
+
+def update(model, Y_new):
+    """Fold new (towers x k) observations into a fitted model without refitting."""
+    _smooth(np.ascontiguousarray(Y_new.T), model["alpha"], model["beta"], model["gamma"],
+            model["season"], model["level"], model["trend"], model["seasonal"], start=model["steps"])
+    model["steps"] += Y_new.shape[1]
+    return model
+
+
+def forecast(model, horizon=HORIZON):
+    """(towers x horizon) point forecasts."""
+    k = np.arange(1, horizon + 1)
+    idx = (model["steps"] - 1 + k) % model["season"]
+    return model["level"][:, None] + k * model["trend"][:, None] + model["seasonal"][idx].T
+
+
+def _digest(Y):
+    return hashlib.sha256(np.ascontiguousarray(Y).tobytes()).hexdigest()
+
+
+def _copy(model):
+    return {k: v.copy() if isinstance(v, np.ndarray) else v for k, v in model.items()}
+
+
+def _extends(previous, towers, index, Y):
+    # The saved state still describes the first `steps` hours of Y
+    return (
+        previous is not None
+        and previous["season"] == _season(Y.shape[1] - 1)
+        and np.array_equal(previous["towers"], towers.astype(str))
+        and previous["start"] == np.datetime64(index[0], "ns")
+        and previous["steps"] < Y.shape[1]
+        and previous["digest"] == _digest(Y[:, :previous["steps"]])
+    )
+
+
+def _season(steps):
+    # A full season is needed to initialise the seasonal profile
+    return SEASON if steps >= SEASON else 1
+
+
+def forecast_fleet(df, targets=TARGETS, horizon=HORIZON, freq=FREQ, previous=None):
+    """
+    Fit (or, from `previous` saved state, update) every target for all
+    towers; returns (forecasts frame, models, timings, modes).
+
+    The frame has one row per tower, target and future hour, with a `high`
+    flag where the forecast crosses that target's threshold, plus each
+    tower's latest INFO_COLS so consumers can filter without another source.
+    """
+    previous = previous or {}
+    info_cols = [c for c in INFO_COLS if c in df.columns]
+    info = df.sort_values("timestamp").groupby("tower_id")[info_cols].last()
+    frames, models, timings, modes = [], {}, {}, {}
+    for col in targets:
+        towers, index, Y = tower_matrix(df, col, freq)
+        done = max(Y.shape[1] - 1, 1)   # hours kept in the saved state (all but the newest)
+        start = time.perf_counter()
+        prev = previous.get(col)
+        if _extends(prev, towers, index, Y):
+            model = update(prev, Y[:, prev["steps"]:done])
+            modes[col] = "updated"
+        elif _season(done) == SEASON:
+            model = fit(Y[:, :done])
+            modes[col] = "fitted"
+        else:
+            model = fit(Y[:, :done], season=1, grid=TREND_GRID)
+            modes[col] = f"fitted without seasonality ({done}h < {SEASON}h)"
+        latest = update(_copy(model), Y[:, done:])
+        pred = forecast(latest, horizon)
+        timings[col] = time.perf_counter() - start
+        if col in BOUNDS:
+            pred = np.clip(pred, *BOUNDS[col])
+        threshold = HIGH_LOAD.get(col, float(df[col].quantile(HIGH_QUANTILE)))
+        future = pd.date_range(index[-1], periods=horizon + 1, freq=freq)[1:]
+        frames.append(pd.DataFrame({
+            "tower_id": np.repeat(towers, horizon),
+            "target": col,
+            "timestamp": np.tile(future, len(towers)),
+            "forecast": pred.ravel(),
+            "threshold": threshold,
+            "high": pred.ravel() >= threshold,
+            **{c: np.repeat(info[c].reindex(towers).to_numpy(), horizon) for c in info_cols},
+        }))
+        models[col] = dict(
+            model, towers=towers.astype(str), start=np.datetime64(index[0], "ns"),
+            digest=_digest(Y[:, :done]),
+        )
+    return pd.concat(frames, ignore_index=True), models, timings, modes
+
+
+def save_forecasts(forecasts, models, path=FORECAST_PATH, state_path=STATE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    forecasts.to_parquet(path, index=False)
+    state = {}
+    for col, model in models.items():
+        for key, value in model.items():
+            state[f"{col}/{key}"] = np.asarray(value)
+    # Plain (non-object) arrays only, so load_state needs no pickle
+    np.savez(state_path, **state)
+
+
+def load_state(state_path=STATE_PATH):
+    """{target: model} saved by save_forecasts, or {} if missing / unreadable."""
+    if not os.path.exists(state_path):
+        return {}
+    models = {}
+    try:
+        with np.load(state_path, allow_pickle=False) as saved:
+            for name in saved.files:
+                col, key = name.split("/", 1)
+                models.setdefault(col, {})[key] = saved[name]
+    except (OSError, ValueError):
+        return {}
+    for model in models.values():
+        for key in ("steps", "season"):
+            model[key] = int(model[key])
+        model["digest"] = str(model["digest"])
+        model["start"] = model["start"][()]
+    # A state written before these keys existed can't be extended
+    return {col: m for col, m in models.items() if {"towers", "start", "digest"} <= m.keys()}
+
+
+def load_forecasts(path=FORECAST_PATH):
+    """Stored forecasts, or None if they haven't been produced yet (or predate INFO_COLS)."""
+    if not os.path.exists(path):
+        return None
+    forecasts = pd.read_parquet(path)
+    return forecasts if set(INFO_COLS) <= set(forecasts.columns) else None
+
+
+def run(data_path=DATA_PATH, path=FORECAST_PATH, state_path=STATE_PATH):
+    """Forecast from `data_path`, continuing from the state at `state_path` where it still applies."""
+    df = pd.read_csv(data_path, usecols=["timestamp", "tower_id"] + INFO_COLS + TARGETS, parse_dates=["timestamp"])
+    forecasts, models, timings, modes = forecast_fleet(df, previous=load_state(state_path))
+    save_forecasts(forecasts, models, path, state_path)
+    return forecasts, models, timings, modes
+
+
+if __name__ == "__main__":
+    forecasts, models, timings, modes = run()
+    for col, seconds in timings.items():
+        model = models[col]
+        print(f"{col}: {modes[col]} {len(model['towers'])} towers x {model['steps']} steps "
+              f"({len(GRID)} parameter sets each) in {seconds:.3f}s, median RMSE {np.median(model['rmse']):.2f}")
+    high = forecasts[forecasts["high"]].groupby("target")["tower_id"].nunique()
+    for col in TARGETS:
+        print(f"  {col}: {high.get(col, 0)} towers expected above threshold in the next {HORIZON}h")
+    print(f"Forecasts saved to {os.path.abspath(FORECAST_PATH)}")
@@ -0,0 +1,140 @@
+"""
+Incremental append ingestion.
+
+Each call takes one batch of raw generator-style records, keeps only the rows
+newer than that source's timestamp watermark, cleans and scores them with the
+persisted anomaly model (no refit) and writes them as day-partitioned Parquet
+files:
+
+    data/partitions/date=2025-08-22/part-<source>-<first ts>-<id>.parquet
+
+History is never re-read or rewritten; the app picks up new part files (see
+dataset.py). A single writer per partition directory is assumed.
+
+    python src/ingest.py --batch new_records.json --source collector-1
+    python src/ingest.py --generate 288          # one synthetic day
+"""
+import argparse
+import json
+import os
+import threading
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from anomaly_detection_model import FINAL_PATH, load_or_fit_model, preprocess, score
+from clustering import assign_clusters, load_or_fit_clusters
+from data_scripts import cleaner, generator
+from feature_store import FEATURE_COLS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PARTITION_DIR = os.path.join(BASE_DIR, "..", "data", "partitions")
+WATERMARK_FILE = "_watermarks.json"
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def _get_models():
+    # Loaded once per process; ingestion never refits
+    with _models_lock:
+        if not _models:
+            _models["anomaly"] = load_or_fit_model()
+            _models["clusters"] = load_or_fit_clusters()
+    return _models["anomaly"], _models["clusters"]
+
+
+def load_watermarks(partition_dir=PARTITION_DIR):
+    path = os.path.join(partition_dir, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_watermarks(marks, partition_dir=PARTITION_DIR):
+    os.makedirs(partition_dir, exist_ok=True)
+    path = os.path.join(partition_dir, WATERMARK_FILE)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(marks, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _enrich(df, iso, clusters):
+    df = preprocess(df)
+    df = score(df, iso)
+    df["cluster"] = assign_clusters(df[FEATURE_COLS].to_numpy(dtype=np.float32), clusters)
+    return df
+
+
+def prepare_batch(records):
+    """Clean, enrich and score raw records with the persisted models (no watermark)."""
+    iso, clusters = _get_models()
+    return _enrich(cleaner.clean(records), iso, clusters)
+
+
+def write_partitions(df, source, partition_dir=PARTITION_DIR):
+    """Write one Parquet file per day touched by `df`; returns the new paths."""
+    paths = []
+    days = df["timestamp"].dt.strftime("%Y-%m-%d")
+    for day, part in df.groupby(days, sort=True):
+        day_dir = os.path.join(partition_dir, f"date={day}")
+        os.makedirs(day_dir, exist_ok=True)
+        first = part["timestamp"].min().strftime("%H%M%S")
+        path = os.path.join(day_dir, f"part-{source}-{first}-{uuid.uuid4().hex[:8]}.parquet")
+        # Readers glob *.parquet, so they never see a half-written file
+        tmp = f"{path}.tmp"
+        part.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+        paths.append(path)
+    return paths
+
+
+def append_records(records, source="generator", partition_dir=PARTITION_DIR):
+    """
+    Ingest one batch for `source`. Rows at or before the source's watermark
+    are dropped as already seen. Returns (rows written, new partition paths).
+    """
+    df = cleaner.clean(records)
+    marks = load_watermarks(partition_dir)
+    if source in marks:
+        df = df[df["timestamp"] > pd.Timestamp(marks[source])]
+    if df.empty:
+        return 0, []
+
+    iso, clusters = _get_models()
+    df = _enrich(df.reset_index(drop=True), iso, clusters)
+    paths = write_partitions(df, source, partition_dir)
+    marks[source] = df["timestamp"].max().isoformat()
+    save_watermarks(marks, partition_dir)
+    return len(df), paths
+
+
+def synthetic_batch(num_rows, source="generator", partition_dir=PARTITION_DIR):
+    """Generator records continuing right after the source's watermark."""
+    marks = load_watermarks(partition_dir)
+    if source in marks:
+        last = pd.Timestamp(marks[source])
+    else:
+        last = pd.read_csv(FINAL_PATH, usecols=["timestamp"], parse_dates=["timestamp"])["timestamp"].max()
+    return generator.generate_data(num_rows, start=(last + pd.Timedelta(minutes=5)).to_pydatetime())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Append a batch of tower records")
+    parser.add_argument("--batch", help="JSON file with generator-style records")
+    parser.add_argument("--generate", type=int, help="generate this many synthetic rows instead")
+    parser.add_argument("--source", default="generator")
+    args = parser.parse_args()
+
+    if args.batch:
+        with open(args.batch) as f:
+            records = json.load(f)
+    else:
+        records = synthetic_batch(args.generate or 288, args.source)
+    n, paths = append_records(records, args.source)
+    print(f"Appended {n} rows from {args.source} into {len(paths)} partition file(s)")
+    for path in paths:
+        print(f"  {os.path.relpath(path)}")
@@ -0,0 +1,145 @@
+"""
+Live feed for page1's live mode.
+
+A background thread pulls a batch of raw records every tick (the synthetic
+generator stands in for the collectors), cleans and scores it with the
+persisted models, and keeps it in a bounded, sequence-numbered ring. Clients
+ask for "everything after seq N", so a live update costs the new rows only.
+
+Running KPI sums are kept per (operator, network_type): seeded once from the
+dataset, then bumped per live batch and per frame the dataset appends (new
+partitions from ingest.py), so KPI cards never rescan history.
+
+The feed is per process; with several Gunicorn workers each has its own, and
+clients that land on another worker just resync to that worker's head.
+"""
+import itertools
+import logging
+import threading
+import uuid
+from collections import deque
+
+import pandas as pd
+
+from data_scripts import generator
+from ingest import prepare_batch
+from startup import hold_across_fork
+
+log = logging.getLogger("live")
+
+TICK_SECONDS = 5.0      # how often the feed produces a batch
+ROWS_PER_TICK = 5       # rows per batch (one per simulated 5 minutes)
+RING_BATCHES = 720      # batches kept for late / reconnecting clients
+
+KPI_SUMS = ["latency_sec", "dropped_calls", "bandwidth_numeric", "call_drop_rate"]
+GROUP_COLS = ["operator", "network_type"]
+
+
+class LiveFeed:
+    def __init__(self, dataset, source=None, tick=TICK_SECONDS, rows=ROWS_PER_TICK):
+        self.dataset = dataset
+        self.tick = tick
+        self.rows = rows
+        self.epoch = uuid.uuid4().hex[:8]   # identifies this feed's seq numbers
+        self.source = source or self._synthetic_source()
+        self._seq = itertools.count(1)
+        self.head = 0
+        self._ring = deque(maxlen=RING_BATCHES)
+        self._lock = hold_across_fork(threading.Lock())   # taken by the feed thread every tick
+        self._stop = threading.Event()
+        self._thread = None
+        self.sums = {}
+        # Seeding and subscribing happen under the dataset's lock, so each
+        # appended row is counted exactly once
+        dataset.subscribe(self._add_sums, seed=self._add_sums)
+
+    def _synthetic_source(self):
+        # Continue right after the served history, 5 simulated minutes per row
+        state = {"next": self.dataset.time_range()[1] + pd.Timedelta(minutes=5)}
+
+        def source(n):
+            records = generator.generate_data(n, start=state["next"].to_pydatetime())
+            state["next"] += pd.Timedelta(minutes=5 * n)
+            return records
+        return source
+
+    def _add_sums(self, frame):
+        grouped = frame.groupby(GROUP_COLS)
+        delta = grouped[KPI_SUMS].sum()
+        delta["count"] = grouped.size()
+        with self._lock:
+            for key, row in delta.iterrows():
+                acc = self.sums.setdefault(key, dict.fromkeys(row.index, 0))
+                for col, value in row.items():
+                    acc[col] += value
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="live-feed", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.tick):
+            try:
+                self.push(prepare_batch(self.source(self.rows)))
+            except Exception:  # keep the feed alive on a bad batch
+                log.exception("dropped batch")
+
+    def push(self, batch):
+        """Add one prepared batch; updates the ring and running sums."""
+        self._add_sums(batch)
+        with self._lock:
+            seq = next(self._seq)
+            self._ring.append((seq, batch))
+            self.head = seq
+        return seq
+
+    def since(self, seq):
+        """(rows after `seq`, new head). Bounded by the ring size."""
+        with self._lock:
+            batches = [b for s, b in self._ring if s > seq]
+            head = self.head
+        if not batches:
+            return None, head
+        return pd.concat(batches, ignore_index=True), head
+
+    def kpis(self, operators=None, network_types=None):
+        """Filter-aware KPI values from the running sums (O(groups))."""
+        total = dict.fromkeys(KPI_SUMS + ["count"], 0)
+        with self._lock:
+            for (op, nt), acc in self.sums.items():
+                if operators and op not in operators:
+                    continue
+                if network_types and nt not in network_types:
+                    continue
+                for col in total:
+                    total[col] += acc[col]
+        n = total["count"] or float("nan")
+        return {
+            "latency_sec": total["latency_sec"] / n,
+            "dropped_calls": int(total["dropped_calls"]),
+            "bandwidth_numeric": total["bandwidth_numeric"] / n,
+            "call_drop_rate": total["call_drop_rate"] / n,
+        }
+
+
+_feed = None
+_feed_lock = threading.Lock()
+
+
+def get_feed(dataset):
+    """Process-wide feed, started on first use."""
+    global _feed
+    with _feed_lock:
+        if _feed is None:
+            _feed = LiveFeed(dataset).start()
+    return _feed
+
+
+def current_feed():
+    """The process's feed if one was started, else None (never starts one)."""
+    return _feed
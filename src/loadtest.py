@@ -0,0 +1,623 @@
+"""
+Load test: simulated analysts driving the app's real callback endpoint.
+
+    python src/loadtest.py                                    # gunicorn 1x1, 1x4, 2x4, 4x4; 20 sessions
+    python src/loadtest.py --configs 2x4 4x8 --sessions 10 50 --duration 120
+    python src/loadtest.py --server inprocess                 # threaded Werkzeug server in this process
+    python src/loadtest.py --url http://127.0.0.1:8050        # a server that is already running
+
+For every configuration (Gunicorn workers x threads) the app is started on
+localhost, and each session behaves like a browser tab running the Dash
+renderer: it loads the layout, sends /_dash-update-component requests for
+the callbacks a change triggers (initial calls for newly mounted components,
+then the chain of callbacks fed by each response, up to BROWSER_CONNECTIONS
+at a time), and polls background callbacks at their interval until they
+finish. Between think times a session changes a filter, switches tabs,
+toggles the theme or clicks through to /page2 and runs a prediction.
+
+The request payloads are built from /_dash-dependencies and the layouts the
+server returns, so they stay in step with the pages. Clientside callbacks
+(the theme swap) run in the browser and send nothing; toggling the theme
+only changes the State later requests carry. Latency is measured per
+callback from the first request to the final response, polling included.
+Requests started during the warm-up period are not counted.
+"""
+import argparse
+import base64
+import contextlib
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import requests  # type: ignore
+from urllib3.util.retry import Retry  # type: ignore
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, ".."))
+LOG_DIR = os.path.join(ROOT_DIR, ".cache", "loadtest")
+
+CONFIGS = ["1x1", "1x4", "2x4", "4x4"]   # gunicorn workers x threads
+SESSIONS = [20]
+DURATION = 60.0           # measured seconds per run
+WARMUP = 10.0             # seconds of traffic before measuring starts
+THINK = 2.0               # mean pause between a session's actions
+BROWSER_CONNECTIONS = 6   # concurrent callback requests per session
+STARTUP_TIMEOUT = 180.0
+REQUEST_TIMEOUT = 300.0
+SEED = 42
+
+ACTIONS = {"filter": 4, "tab": 3, "theme": 1, "page2": 2}   # relative weights
+DISPATCH = "/_dash-update-component"
+LAYOUT_LABEL = "GET /_dash-layout"
+
+
+def id_key(component_id):
+    """Dash's string form of a component id (dict ids as sorted compact JSON)."""
+    if isinstance(component_id, dict):
+        return json.dumps(component_id, sort_keys=True, separators=(",", ":"))
+    return component_id
+
+
+def _parse_id(text):
+    return json.loads(text) if text.startswith("{") else text
+
+
+def _split_dep(text):
+    # "id.prop" (with an "@hash" suffix on allow_duplicate outputs)
+    component_id, prop = text.split("@", 1)[0].rsplit(".", 1)
+    return _parse_id(component_id), prop
+
+
+def _wildcard(component_id):
+    return isinstance(component_id, dict) and any(isinstance(v, list) for v in component_id.values())
+
+
+def _is_component(value):
+    return isinstance(value, dict) and "props" in value and "type" in value
+
+
+class Callback:
+    """One entry of /_dash-dependencies."""
+
+    def __init__(self, spec):
+        self.output = spec["output"]
+        self.multi = self.output.startswith("..")
+        parts = self.output[2:-2].split("...") if self.multi else [self.output]
+        self.outputs = [_split_dep(part) for part in parts]
+        self.inputs = [(_parse_id(d["id"]), d["property"]) for d in spec["inputs"]]
+        self.state = [(_parse_id(d["id"]), d["property"]) for d in spec["state"]]
+        self.clientside = spec.get("clientside_function") is not None
+        self.prevent_initial_call = bool(spec.get("prevent_initial_call"))
+        background = spec.get("background")
+        self.poll_interval = background.get("interval", 1000) / 1000 if background else None
+        # Only ALL wildcards are resolved; MATCH / ALLSMALLER callbacks are never sent
+        self.supported = all(
+            v == ["ALL"] for cid, _ in self.outputs + self.inputs + self.state
+            if _wildcard(cid) for v in cid.values() if isinstance(v, list)
+        )
+        first_id, first_prop = self.outputs[0]
+        extra = f" (+{len(self.outputs) - 1})" if len(self.outputs) > 1 else ""
+        self.name = f"{id_key(first_id)}.{first_prop}{extra}"
+
+
+# -------------------
+# Results
+# -------------------
+class Stats:
+    def __init__(self, measure_from):
+        self.measure_from = measure_from
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.reasons = Counter()
+        self.http_requests = 0
+        self.actions = 0
+        self._lock = threading.Lock()
+
+    def record(self, name, started, seconds, error=None, http_requests=1):
+        if started < self.measure_from:
+            return
+        with self._lock:
+            self.latencies[name].append(seconds)
+            self.http_requests += http_requests
+            if error:
+                self.errors[name] += 1
+                self.reasons[f"{name}: {error}"] += 1
+
+    def failure(self, name, started, error):
+        """An error outside any single callback's request (no latency sample)."""
+        if started < self.measure_from:
+            return
+        with self._lock:
+            self.errors[name] += 1
+            self.reasons[f"{name}: {error}"] += 1
+
+    def action(self, started):
+        if started >= self.measure_from:
+            with self._lock:
+                self.actions += 1
+
+    def summary(self, elapsed):
+        callbacks = {}
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            values = self.latencies.get(name) or [0.0]
+            p50, p95, p99 = (float(p) for p in np.percentile(values, [50, 95, 99]))
+            count = len(self.latencies.get(name, []))
+            callbacks[name] = {
+                "count": count, "errors": self.errors[name], "throughput": count / elapsed,
+                "p50": p50, "p95": p95, "p99": p99, "max": max(values),
+            }
+        every = [v for values in self.latencies.values() for v in values]
+        total = {
+            "callbacks": len(every), "errors": sum(self.errors.values()),
+            "http_requests": self.http_requests, "actions": self.actions, "seconds": elapsed,
+            "throughput": len(every) / elapsed, "http_throughput": self.http_requests / elapsed,
+        }
+        if every:
+            total.update(zip(("p50", "p95", "p99"), (float(p) for p in np.percentile(every, [50, 95, 99]))))
+        return {"total": total, "callbacks": callbacks, "errors": dict(self.reasons.most_common())}
+
+
+# -------------------
+# Simulated browser session
+# -------------------
+class Session:
+    def __init__(self, base_url, callbacks, stats, rng):
+        self.base_url = base_url
+        self.callbacks = [cb for cb in callbacks if cb.supported and not cb.clientside]
+        self.stats = stats
+        self.rng = rng
+        self.http = requests.Session()
+        # Resend once when the server closed a kept-alive connection, as browsers do
+        retry = Retry(total=1, connect=1, read=1, status=0, allowed_methods=None)
+        self.http.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=BROWSER_CONNECTIONS, max_retries=retry))
+        self.pool = ThreadPoolExecutor(BROWSER_CONNECTIONS)
+        self.components = {}   # id key -> props
+        self.ids = {}          # id key -> component id
+        self.owned = {}        # id key -> id keys mounted in its subtree
+        self.navigate_to = None
+        self.date_range = None  # the date picker's full range, read on first use
+
+    def close(self):
+        self.pool.shutdown()
+        self.http.close()
+
+    # --- layout bookkeeping ---
+    def _walk(self, node):
+        found = []
+        if isinstance(node, list):
+            for item in node:
+                found += self._walk(item)
+        elif _is_component(node):
+            props = node["props"]
+            inner = []
+            for value in props.values():
+                if isinstance(value, (list, dict)):
+                    inner += self._walk(value)
+            if props.get("id") is not None:
+                key = id_key(props["id"])
+                self.ids[key] = props["id"]
+                self.components[key] = dict(props)
+                self.owned[key] = set(inner)
+                found.append(key)
+            found += inner
+        return found
+
+    def _mount(self, key, tree):
+        for old in self.owned.pop(key, ()):
+            self.ids.pop(old, None)
+            self.components.pop(old, None)
+            self.owned.pop(old, None)
+        found = self._walk(tree)
+        self.owned[key] = set(found)
+        return found
+
+    def _value(self, key, prop):
+        return self.components.get(key, {}).get(prop)
+
+    def _set(self, key, prop, value):
+        self.components.setdefault(key, {})[prop] = value
+
+    def _matching(self, pattern):
+        fixed = {k: v for k, v in pattern.items() if not isinstance(v, list)}
+        return [key for key, cid in self.ids.items()
+                if isinstance(cid, dict) and cid.keys() == pattern.keys()
+                and all(cid[k] == v for k, v in fixed.items())]
+
+    def _keys(self, component_id):
+        return self._matching(component_id) if _wildcard(component_id) else [id_key(component_id)]
+
+    # --- callback dispatch ---
+    def _runnable(self, cb):
+        return all(id_key(cid) in self.ids for cid, _ in cb.outputs + cb.inputs + cb.state if not _wildcard(cid))
+
+    def _triggered(self, changed, mounted):
+        # {callback: changed inputs} for what a change / newly mounted ids set off
+        found = {}
+        for cb in self.callbacks:
+            if not self._runnable(cb):
+                continue
+            hits = [f"{key}.{prop}" for cid, prop in cb.inputs for key in self._keys(cid) if (key, prop) in changed]
+            if hits:
+                found[cb] = hits
+            elif not cb.prevent_initial_call and any(
+                key in mounted for cid, _ in cb.inputs + cb.outputs for key in self._keys(cid)
+            ):
+                found[cb] = []
+        return found
+
+    def _resolve(self, deps, with_values=True):
+        out = []
+        for cid, prop in deps:
+            entries = [{"id": self.ids.get(key, cid), "property": prop} for key in self._keys(cid)]
+            if with_values:
+                for entry in entries:
+                    entry["value"] = self._value(id_key(entry["id"]), prop)
+            out.append(entries if _wildcard(cid) else entries[0])
+        return out
+
+    def _post(self, cb, body):
+        started = time.perf_counter()
+        sent, error, data, params = 0, None, None, {}
+        try:
+            while True:
+                response = self.http.post(self.base_url + DISPATCH, params=params, json=body, timeout=REQUEST_TIMEOUT)
+                sent += 1
+                error = None if response.status_code in (200, 204) else f"HTTP {response.status_code}"
+                data = response.json() if response.status_code == 200 else None
+                if data is not None and not isinstance(data, dict):
+                    raise TypeError("body is not an object")
+                if cb.poll_interval is None or data is None or "response" in data:
+                    break
+                # background job: poll with its cache key until the result is in
+                params = params or {"cacheKey": data["cacheKey"], "job": data["job"]}
+                time.sleep(cb.poll_interval)
+        except requests.RequestException as e:
+            error, data = type(e).__name__, None
+        except (KeyError, TypeError, ValueError) as e:
+            error, data = f"malformed response ({type(e).__name__})", None
+        result = (data or {}).get("response", {})
+        if not isinstance(result, dict) or not all(isinstance(props, dict) for props in result.values()):
+            error, result = "malformed response (outputs)", {}
+        self.stats.record(cb.name, started, time.perf_counter() - started, error, sent)
+        return result
+
+    def _call(self, cb, changed_ids):
+        outputs = self._resolve(cb.outputs, with_values=False)
+        body = {
+            "output": cb.output,
+            "outputs": outputs if cb.multi else outputs[0],
+            "inputs": self._resolve(cb.inputs),
+            "state": self._resolve(cb.state),
+            "changedPropIds": changed_ids,
+        }
+        return self._post(cb, body)
+
+    def _apply(self, response):
+        changed, mounted = set(), []
+        for raw_id, props in response.items():
+            key = id_key(_parse_id(raw_id))
+            for prop, value in props.items():
+                if prop == "children" and (_is_component(value) or isinstance(value, list)):
+                    mounted += self._mount(key, value)
+                if prop == "href" and self._value(key, "refresh") is True:
+                    self.navigate_to = value   # dcc.Location(refresh=True): full page load
+                self._set(key, prop, value)
+                changed.add((key, prop))
+        return changed, mounted
+
+    @staticmethod
+    def _feeds(upstream, cb):
+        outputs = {(id_key(cid), prop) for cid, prop in upstream.outputs}
+        return any((id_key(cid), prop) in outputs for cid, prop in cb.inputs)
+
+    def run(self, changed=(), mounted=()):
+        """Send every callback the change triggers, following the chain to the end."""
+        pending = self._triggered(set(changed), set(mounted))
+        while pending:
+            # The renderer holds a callback back while another one still has to produce its inputs
+            ready = {cb: ids for cb, ids in pending.items()
+                     if not any(self._feeds(other, cb) for other in pending if other is not cb)} or pending
+            responses = list(self.pool.map(lambda item: self._call(*item), ready.items()))
+            pending = {cb: ids for cb, ids in pending.items() if cb not in ready}
+            for response in responses:
+                new_changed, new_mounted = self._apply(response)
+                for cb, ids in self._triggered(new_changed, set(new_mounted)).items():
+                    pending[cb] = sorted(set(pending.get(cb, [])) | set(ids))
+
+    # --- navigation ---
+    def open(self, path="/"):
+        """Full page load: fresh layout, then the pages router for `path`."""
+        self.components, self.ids, self.owned = {}, {}, {}
+        self.navigate_to = None
+        started = time.perf_counter()
+        try:
+            response = self.http.get(self.base_url + "/_dash-layout", timeout=REQUEST_TIMEOUT)
+            error = None if response.status_code == 200 else f"HTTP {response.status_code}"
+        except requests.RequestException as e:
+            error = type(e).__name__
+        self.stats.record(LAYOUT_LABEL, started, time.perf_counter() - started, error)
+        if error:
+            return
+        mounted = self._mount("__root__", response.json())
+        self.navigate(path, mounted)
+
+    def navigate(self, path, mounted=()):
+        """In-app navigation (a NavLink click)."""
+        self._set("_pages_location", "pathname", path)
+        self._set("_pages_location", "search", "")
+        self.run({("_pages_location", "pathname"), ("_pages_location", "search")}, mounted)
+        if self.navigate_to:
+            self.open(self.navigate_to)
+
+    def _page1(self):
+        if "operator_filter" not in self.ids:
+            self.navigate("/")
+
+    # --- actions ---
+    def change_filter(self):
+        self._page1()
+        kind = self.rng.choice(["operator_filter", "network_filter", "date_filter"])
+        if kind == "date_filter":
+            if self.date_range is None:
+                self.date_range = [datetime.fromisoformat(str(self._value(kind, p))[:10])
+                                   for p in ("start_date", "end_date")]
+            start, end = self.date_range
+            days = max((end - start).days, 0)
+            first = start + timedelta(days=self.rng.randint(0, days))
+            last = first + timedelta(days=self.rng.randint(0, (end - first).days))
+            self._set(kind, "start_date", first.date().isoformat())
+            self._set(kind, "end_date", last.date().isoformat())
+            self.run({(kind, "start_date"), (kind, "end_date")})
+            return
+        options = [o["value"] for o in self._value(kind, "options") or []]
+        value = self.rng.sample(options, self.rng.randint(0, len(options))) or None
+        self._set(kind, "value", value)
+        self.run({(kind, "value")})
+
+    def switch_tab(self):
+        self._page1()
+        tabs = [c["props"]["value"] for c in self._value("tabs", "children") or [] if _is_component(c)]
+        choices = [t for t in tabs if t != self._value("tabs", "value")]
+        if choices:
+            self._set("tabs", "value", self.rng.choice(choices))
+            self.run({("tabs", "value")})
+
+    def toggle_theme(self):
+        theme = "light" if self._value("theme-container", "className") == "dark" else "dark"
+        self._set("theme-container", "className", theme)
+        self._set("theme-toggle", "n_clicks", (self._value("theme-toggle", "n_clicks") or 0) + 1)
+        self.run({("theme-container", "className"), ("theme-toggle", "n_clicks")})
+
+    def _click_point(self):
+        # A point on the latency trend, as the Graph's clickData
+        fig = self._value("latency_trend", "figure") or {}
+        traces = [t for t in fig.get("data", []) if t.get("customdata") is not None]
+        if not traces:
+            return None
+        customdata = _decode(traces[0]["customdata"])
+        if not len(customdata):
+            return None
+        row = customdata[self.rng.randrange(len(customdata))]
+        return {"points": [{"curveNumber": 0, "customdata": list(row)}]}
+
+    def visit_page2(self):
+        click = self._click_point() if "latency_trend" in self.ids else None
+        if click is not None:
+            # Click-through from the trend chart (handle_click redirects to /page2)
+            self._set("latency_trend", "clickData", click)
+            self.run({("latency_trend", "clickData")})
+            if self.navigate_to:
+                self.open(self.navigate_to)
+        if "predict-btn" not in self.ids:
+            self.navigate("/page2")
+        for key in self._matching({"type": "feature-input", "index": ["ALL"]}):
+            value = self._value(key, "value")
+            if isinstance(value, (int, float)):
+                self._set(key, "value", round(value * self.rng.uniform(0.8, 1.2), 3))
+        self._set("predict-btn", "n_clicks", (self._value("predict-btn", "n_clicks") or 0) + 1)
+        self.run({("predict-btn", "n_clicks")})
+        self.navigate("/")
+
+
+def _decode(data):
+    # Plotly typed array ({"dtype", "bdata", "shape"}) or a plain list
+    if isinstance(data, dict) and "bdata" in data:
+        values = np.frombuffer(base64.b64decode(data["bdata"]), dtype=data["dtype"])
+        shape = data.get("shape")
+        if shape:
+            values = values.reshape([int(n) for n in str(shape).split(",")])
+        return values.tolist()
+    return data
+
+
+def _session_loop(base_url, callbacks, stats, seed, deadline, think):
+    rng = random.Random(seed)
+    session = Session(base_url, callbacks, stats, rng)
+    actions = {
+        "filter": session.change_filter, "tab": session.switch_tab,
+        "theme": session.toggle_theme, "page2": session.visit_page2,
+    }
+    try:
+        time.sleep(rng.uniform(0, think))  # stagger the first page loads
+        session.open("/")
+        while time.perf_counter() < deadline:
+            time.sleep(rng.uniform(0, 2 * think))
+            if time.perf_counter() >= deadline:
+                break
+            name = rng.choices(list(ACTIONS), weights=list(ACTIONS.values()))[0]
+            started = time.perf_counter()
+            try:
+                actions[name]()
+            except (requests.RequestException, KeyError, TypeError, ValueError) as e:
+                # Page state the action couldn't use (callback failures are
+                # already counted per callback): count it, then reload like a user
+                stats.failure(f"{name} (action)", started, f"{type(e).__name__}: {e}")
+                session.open("/")
+            stats.action(started)
+    finally:
+        session.close()
+
+
+def run_load(base_url, sessions, duration=DURATION, warmup=WARMUP, think=THINK, seed=SEED):
+    specs = requests.get(base_url + "/_dash-dependencies", timeout=REQUEST_TIMEOUT).json()
+    callbacks = [Callback(spec) for spec in specs]
+    start = time.perf_counter()
+    stats = Stats(measure_from=start + warmup)
+    deadline = stats.measure_from + duration
+    threads = [
+        threading.Thread(target=_session_loop, args=(base_url, callbacks, stats, seed + i, deadline, think), daemon=True)
+        for i in range(sessions)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Requests still in flight at the deadline are counted; measure to the last one
+    return stats.summary(max(time.perf_counter() - stats.measure_from, duration))
+
+
+# -------------------
+# Servers
+# -------------------
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url, proc=None, timeout=STARTUP_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"server exited with status {proc.returncode}")
+        try:
+            if requests.get(url + "/_dash-layout", timeout=5).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"server at {url} not ready after {timeout:.0f}s")
+
+
+def parse_config(text):
+    workers, _, threads = text.partition("x")
+    return int(workers), int(threads or 1)
+
+
+@contextlib.contextmanager
+def gunicorn(workers, threads):
+    """`gunicorn src.app:server` (as in the Procfile) on a free localhost port."""
+    port = _free_port()
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_path = os.path.join(LOG_DIR, f"gunicorn-{workers}x{threads}.log")
+    with open(log_path, "w") as log:
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "src.app:server",
+             "--workers", str(workers), "--threads", str(threads),
+             "--bind", f"127.0.0.1:{port}", "--timeout", str(int(REQUEST_TIMEOUT))],
+            cwd=ROOT_DIR, stdout=log, stderr=subprocess.STDOUT,
+        )
+        try:
+            url = f"http://127.0.0.1:{port}"
+            _wait_ready(url, proc)
+            yield url
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+@contextlib.contextmanager
+def inprocess():
+    """The app on a threaded Werkzeug server in this process."""
+    from werkzeug.serving import WSGIRequestHandler, make_server  # type: ignore
+    os.chdir(ROOT_DIR)  # page2 resolves its model path against the working directory
+    sys.path.insert(0, BASE_DIR)
+    import app as dash_app
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server("127.0.0.1", _free_port(), dash_app.server, threaded=True, request_handler=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_port}"
+        _wait_ready(url)
+        yield url
+    finally:
+        server.shutdown()
+
+
+# -------------------
+# Report
+# -------------------
+def _ms(seconds):
+    return f"{seconds * 1000:>9.0f}"
+
+
+def print_summary(label, sessions, result):
+    total = result["total"]
+    print(f"\n{label}, {sessions} sessions: {total['callbacks']} callbacks in {total['seconds']:.0f}s "
+          f"({total['throughput']:.1f}/s, {total['http_throughput']:.1f} HTTP req/s), "
+          f"{total['actions']} actions, {total['errors']} errors")
+    print(f"  {'callback':<44}{'count':>7}{'/s':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'errors':>8}")
+    for name, c in result["callbacks"].items():
+        print(f"  {name[:43]:<44}{c['count']:>7}{c['throughput']:>7.1f}"
+              f"{_ms(c['p50'])}{_ms(c['p95'])}{_ms(c['p99'])}{_ms(c['max'])}{c['errors']:>8}")
+    for reason, count in list(result["errors"].items())[:5]:
+        print(f"  ! {count} x {reason}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", choices=["gunicorn", "inprocess"], default="gunicorn")
+    parser.add_argument("--url", help="test a running server instead of starting one")
+    parser.add_argument("--configs", nargs="+", default=CONFIGS, help="gunicorn WORKERSxTHREADS, e.g. 2x4")
+    parser.add_argument("--sessions", nargs="+", type=int, default=SESSIONS, help="concurrent sessions per run")
+    parser.add_argument("--duration", type=float, default=DURATION, help="measured seconds per run")
+    parser.add_argument("--warmup", type=float, default=WARMUP, help="unmeasured seconds before each run")
+    parser.add_argument("--think", type=float, default=THINK, help="mean seconds between a session's actions")
+    parser.add_argument("-o", "--output", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        servers = [(args.url, lambda: contextlib.nullcontext(args.url.rstrip("/")))]
+    elif args.server == "inprocess":
+        servers = [("inprocess", inprocess)]
+    else:
+        servers = [(f"gunicorn {c}", lambda c=c: gunicorn(*parse_config(c))) for c in args.configs]
+
+    results = []
+    for label, start_server in servers:
+        with start_server() as url:
+            for sessions in args.sessions:
+                result = run_load(url, sessions, args.duration, args.warmup, args.think)
+                print_summary(label, sessions, result)
+                results.append({"server": label, "sessions": sessions, **result})
+
+    print(f"\n{'server':<20}{'sessions':>9}{'callbacks/s':>13}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for r in results:
+        t = r["total"]
+        print(f"{r['server']:<20}{r['sessions']:>9}{t['throughput']:>13.1f}"
+              f"{_ms(t.get('p50', 0))}{_ms(t.get('p95', 0))}{_ms(t.get('p99', 0))}{t['errors']:>8}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+Per-callback instrumentation for the Dash app, exposed at /metrics.
+
+For every /_dash-update-component request this records, per callback
+function name:
+
+- wall time (histogram), split into JSON serialization (time spent in Dash's
+  response encoder) and compute (everything else: the callback itself plus
+  dispatch)
+- request and response payload bytes (response bytes as sent, i.e. after
+  compression when the fast path is on)
+- LRUCache hits / misses during the request (see cache.py)
+- optionally, peak Python allocation via tracemalloc on a sample of requests
+  (METRICS_TRACEMALLOC_RATE, e.g. 0.05; off by default, it slows the traced
+  request down considerably)
+
+Callbacks slower than SLOW_CALLBACK_SECONDS (env, default 1.0) are logged.
+Background callbacks run in another process, so only their dispatch and
+polling requests show up here. Counters are per process: with several
+Gunicorn workers each one reports its own.
+"""
+import logging
+import os
+import random
+import threading
+import time
+import tracemalloc
+
+import dash._callback as dash_callback  # type: ignore
+import flask  # type: ignore
+
+import cache
+
+log = logging.getLogger("metrics")
+
+SLOW_CALLBACK_SECONDS = float(os.environ.get("SLOW_CALLBACK_SECONDS", "1.0"))
+TRACEMALLOC_RATE = float(os.environ.get("METRICS_TRACEMALLOC_RATE", "0"))
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+DISPATCH_PATH = "_dash-update-component"
+
+COUNTERS = [
+    # (name, help) for the per-callback totals kept in `_Stats`
+    ("calls", "Callback requests handled."),
+    ("errors", "Callback requests that returned a 5xx."),
+    ("slow", "Callback requests slower than the slow-callback threshold."),
+    ("compute_seconds", "Time outside JSON serialization (callback + dispatch)."),
+    ("serialize_seconds", "Time spent serializing callback responses."),
+    ("request_bytes", "Callback request payload bytes."),
+    ("response_bytes", "Callback response payload bytes as sent."),
+    ("cache_hits", "LRUCache hits during callback requests."),
+    ("cache_misses", "LRUCache misses during callback requests."),
+    ("alloc_samples", "Requests sampled with tracemalloc."),
+]
+
+
+class _Stats:
+    def __init__(self):
+        for name, _ in COUNTERS:
+            setattr(self, name, 0)
+        self.buckets = [0] * len(BUCKETS)
+        self.seconds = 0.0
+        self.peak_alloc = 0
+
+    def observe(self, seconds):
+        self.seconds += seconds
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+
+
+_stats = {}
+_lock = threading.Lock()
+_tracing = threading.Lock()  # tracemalloc is process-wide: one sampled request at a time
+
+
+# -------------------
+# Hooks
+# -------------------
+def _timed_to_json(to_json):
+    def wrapper(value):
+        start = time.perf_counter()
+        try:
+            return to_json(value)
+        finally:
+            if flask.has_request_context() and "metrics" in flask.g:
+                flask.g.metrics["serialize"] += time.perf_counter() - start
+    return wrapper
+
+
+def _on_cache_lookup(hit):
+    if flask.has_request_context() and "metrics" in flask.g:
+        flask.g.metrics["hits" if hit else "misses"] += 1
+
+
+def _callback_name(app, body):
+    entry = app.callback_map.get((body or {}).get("output"), {})
+    fn = entry.get("callback")
+    return getattr(fn, "__name__", None) or (body or {}).get("output", "unknown")
+
+
+def _before():
+    if not flask.request.path.endswith(DISPATCH_PATH):
+        return
+    m = flask.g.metrics = {
+        "start": time.perf_counter(), "serialize": 0.0, "hits": 0, "misses": 0,
+        "request_bytes": flask.request.content_length or 0, "traced": False,
+    }
+    if TRACEMALLOC_RATE and random.random() < TRACEMALLOC_RATE and _tracing.acquire(blocking=False):
+        m["traced"] = True
+        m["was_tracing"] = tracemalloc.is_tracing()
+        if m["was_tracing"]:
+            tracemalloc.reset_peak()
+        else:
+            tracemalloc.start()
+
+
+def _after(app):
+    def after(response):
+        m = flask.g.pop("metrics", None)
+        if m is None:
+            return response
+        peak = None
+        if m["traced"]:
+            peak = tracemalloc.get_traced_memory()[1]
+            if not m["was_tracing"]:
+                tracemalloc.stop()
+            _tracing.release()
+        wall = time.perf_counter() - m["start"]
+        name = _callback_name(app, flask.request.get_json(silent=True))
+        sent = 0 if response.is_streamed else len(response.get_data())
+        record(name, wall, m["serialize"], m["request_bytes"], sent,
+               m["hits"], m["misses"], peak, response.status_code >= 500)
+        return response
+    return after
+
+
+def record(name, wall, serialize, request_bytes, response_bytes, hits, misses, peak=None, error=False):
+    slow = wall >= SLOW_CALLBACK_SECONDS
+    with _lock:
+        s = _stats.setdefault(name, _Stats())
+        s.calls += 1
+        s.errors += int(error)
+        s.slow += int(slow)
+        s.observe(wall)
+        s.serialize_seconds += serialize
+        s.compute_seconds += wall - serialize
+        s.request_bytes += request_bytes
+        s.response_bytes += response_bytes
+        s.cache_hits += hits
+        s.cache_misses += misses
+        if peak is not None:
+            s.alloc_samples += 1
+            s.peak_alloc = max(s.peak_alloc, peak)
+    if slow:
+        log.warning(
+            "slow callback %s: %.3fs (compute %.3fs, serialize %.3fs), %d B in, %d B out, cache %d hit / %d miss%s",
+            name, wall, wall - serialize, serialize, request_bytes, response_bytes, hits, misses,
+            f", peak alloc {peak / 1e6:.1f} MB" if peak is not None else "",
+        )
+
+
+# -------------------
+# Prometheus text exposition
+# -------------------
+def _label(name):
+    return name.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render():
+    with _lock:
+        stats = {name: s for name, s in _stats.items()}
+        lines = []
+        for counter, help_text in COUNTERS:
+            metric = f"dash_callback_{counter}_total"
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            lines += [f'{metric}{{callback="{_label(n)}"}} {getattr(s, counter)}' for n, s in stats.items()]
+
+        metric = "dash_callback_duration_seconds"
+        lines += [f"# HELP {metric} Callback request wall time.", f"# TYPE {metric} histogram"]
+        for n, s in stats.items():
+            for bound, count in zip(BUCKETS, s.buckets):
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{metric}_bucket{{callback="{_label(n)}",le="{le}"}} {count}')
+            lines.append(f'{metric}_sum{{callback="{_label(n)}"}} {s.seconds}')
+            lines.append(f'{metric}_count{{callback="{_label(n)}"}} {s.calls}')
+
+        metric = "dash_callback_peak_alloc_bytes"
+        lines += [f"# HELP {metric} Largest tracemalloc peak seen for the callback.", f"# TYPE {metric} gauge"]
+        lines += [f'{metric}{{callback="{_label(n)}"}} {s.peak_alloc}' for n, s in stats.items() if s.alloc_samples]
+    return "\n".join(lines) + "\n"
+
+
+def instrument(app):
+    """Attach the hooks to a Dash app and serve /metrics on its Flask server."""
+    dash_callback.to_json = _timed_to_json(dash_callback.to_json)
+    cache.add_listener(_on_cache_lookup)
+    app.server.before_request(_before)
+    app.server.after_request(_after(app))
+    app.server.add_url_rule(
+        "/metrics", "metrics",
+        lambda: flask.Response(render(), mimetype="text/plain; version=0.0.4"),
+    )
@@ -1,98 +1,152 @@
 #!/usr/bin/env python
 # coding: utf-8
+from urllib.parse import urlencode
+
 import pandas as pd
-# import numpy as np
-from sklearn.ensemble import IsolationForest
+import numpy as np
 import dash  # type: ignore
 from dash import dcc, html, Input, Output, State, callback  # type: ignore
 import plotly.express as px  # type: ignore
-# import plotly.io as pio  # type: ignore
-# import plotly.graph_objects as   # type: ignore
-import os
+import plotly.io as pio  # type: ignore
+import plotly.graph_objects as go  # type: ignore
+from cache import LRUCache
+from dataset import filter_key, get_dataset, normalize_filters
+from density import bin_share
+from fastpath import pack_figure
+from feature_store import ANOMALY_COLS, FEATURE_COLS
+from live import current_feed, get_feed
+from startup import add_warmup
     
 dash.register_page(__name__, path="/")
 
-df = pd.read_csv(os.path.join(os.path.dirname(__file__), "final_data.csv"))
+# final_data.csv + appended day partitions (see dataset.py / ingest.py),
+# loaded on first use or by the warm-up at boot (see startup.py)
+add_warmup(get_dataset)
 
-# Dropdown options
-operators = [{"label": op, "value": op} for op in df["operator"].unique()]
-network_types = [{"label": nt, "value": nt} for nt in df["network_type"].unique()]
+LIVE_INTERVAL_MS = 5000   # live mode poll period
+LIVE_WINDOW = 2000        # points kept per trend trace while live
 
+# Built figures keyed by (figure, tab, filter state, data version). Theme is
+# not part of the key: the cached figure is themed on the way out, and theme
+# toggles are applied in the browser (assets/theme.js).
+FIGURES = LRUCache(maxsize=64, ttl=300)
+TEMPLATES = {
+    "dark": pio.templates["plotly_dark"].to_plotly_json(),
+    "light": pio.templates["plotly_white"].to_plotly_json(),
+}
+MAP_STYLES = {"dark": "carto-darkmatter", "light": "carto-positron"}
 
-FEATURE_COLS = [
-    'latency_sec', 'bandwidth_mbps', 'dropped_calls', 'total_calls',
-    'uptime_percent', 'users_connected', 'download_speed_mbps', 'upload_speed_mbps',
-    'signal_strength.RSSI', 'signal_strength.RSRP', 'signal_strength.SINR',
-    'tower_load_percent', 'average_call_duration_sec', 'handover_success_rate',
-    'packet_loss_percent', 'jitter_ms', 'tower_temperature_c', 'battery_backup_hours',
-    'tower_age_years'
+# A filter change cancels any background job still running for the old one
+FILTER_INPUTS = [
+    Input("operator_filter", "value"),
+    Input("network_filter", "value"),
+    Input("date_filter", "start_date"),
+    Input("date_filter", "end_date"),
 ]
+MIN_RESCORE_ROWS = 50
 
-layout = html.Div(
-    className="dark",
-    id="theme-container",
-    children=[
-        html.Div (
-        className="container",
-        children =[dcc.Store(id="filtered-data"),
-        html.H1(
-            "📡 Network Performance Optimization Dashboard",
-            style={"textAlign": "center"},
-        ),
+# Anomaly scatter density mode
+DENSITY_MIN_ROWS = 50_000     # "auto" switches from points to density above this
+DENSITY_BINS = 200            # grid cells per axis
+ZOOM_POINTS = 20_000          # a zoomed region with fewer rows shows every point
+MAX_ANOMALY_POINTS = 20_000   # anomaly overlay is sampled down to this
 
-        # Filters
-        html.Div(
-    className="filter",
-    children=[
-        html.Div([
-            html.Label("Select Operator:"),
-            dcc.Dropdown(id="operator_filter", options=operators, value=None, multi=True, placeholder="")
-        ]),
-        html.Div([
-            html.Label("Select Network Type:"),
-        dcc.Dropdown(
-            id="network_filter",
-            options=network_types,
-            value=None,
-            multi=True,
-            placeholder=""  # removes "Select..."
-        )
-        ]),
-        html.Div(className="datePick",children=[
-            html.Label("Select Date Range:"),
-            dcc.DatePickerRange(
-                id="date_filter",
-                start_date=df["timestamp"].min(),
-                end_date=df["timestamp"].max(),
-                display_format="YYYY-MM-DD",
-            )
-        ], style={"gridColumn": "span 3"}) 
-    ]
-),
-        html.Br(),
+def layout(**kwargs):
+    # Built per page load so options / date range include newly ingested data
+    dataset = get_dataset()
+    dataset.refresh()
+    start_date, end_date = dataset.time_range()
 
-        # KPI Cards
-        html.Div(
-            id="kpi_cards", style={"display": "flex", "justifyContent": "space-around"}
-        ),
-        html.Br(),
+    # Dropdown options
+    operators = [{"label": op, "value": op} for op in dataset.unique("operator")]
+    network_types = [{"label": nt, "value": nt} for nt in dataset.unique("network_type")]
 
-        # Tabs
-        dcc.Tabs(
-        id="tabs",
-        value="trends",
+    return html.Div(
+        className="dark",
+        id="theme-container",
         children=[
-            dcc.Tab(label="Trends", value="trends"),
-            dcc.Tab(label="Anomalies", value="anomalies"),
-            dcc.Tab(label="Geo View", value="geo"),
-        ],persistence=True
-        ),
-        html.Div(id="tab-content"),
+            html.Div (
+            className="container",
+            children =[dcc.Store(id="filtered-data"),
+            dcc.Store(id="plot-templates", data=TEMPLATES),
+            html.H1(
+                "📡 Network Performance Optimization Dashboard",
+                style={"textAlign": "center"},
+            ),
 
-        html.Button("🌙", id="theme-toggle", n_clicks=0, className="theme-btn"),
-        ]),
-    ],
-)
+            # Filters
+            html.Div(
+        className="filter",
+        children=[
+            html.Div([
+                html.Label("Select Operator:"),
+                dcc.Dropdown(id="operator_filter", options=operators, value=None, multi=True, placeholder="")
+            ]),
+            html.Div([
+                html.Label("Select Network Type:"),
+            dcc.Dropdown(
+                id="network_filter",
+                options=network_types,
+                value=None,
+                multi=True,
+                placeholder=""  # removes "Select..."
+            )
+            ]),
+            html.Div(className="datePick",children=[
+                html.Label("Select Date Range:"),
+                dcc.DatePickerRange(
+                    id="date_filter",
+                    start_date=start_date,
+                    end_date=end_date,
+                    display_format="YYYY-MM-DD",
+                )
+            ], style={"gridColumn": "span 3"}) 
+        ]
+    ),
+            # Export of the filtered rows (streamed by /api/export)
+            html.Div(
+                className="export",
+                children=[
+                    dcc.Dropdown(
+                        id="export-columns",
+                        options=[{"label": c, "value": c} for c in dataset.columns],
+                        multi=True,
+                        placeholder="All columns",
+                    ),
+                    dcc.RadioItems(
+                        id="export-format",
+                        options=[{"label": " CSV", "value": "csv"}, {"label": " Parquet", "value": "parquet"}],
+                        value="csv", inline=True,
+                    ),
+                    html.A("⬇ Download filtered data", id="export-link", href="/api/export", download=""),
+                ],
+            ),
+            html.Br(),
+
+            # KPI Cards
+            html.Div(
+                id="kpi_cards", style={"display": "flex", "justifyContent": "space-around"}
+            ),
+            html.Br(),
+
+            # Tabs
+            dcc.Tabs(
+            id="tabs",
+            value="trends",
+            children=[
+                dcc.Tab(label="Trends", value="trends"),
+                dcc.Tab(label="Anomalies", value="anomalies"),
+                dcc.Tab(label="Geo View", value="geo"),
+            ],persistence=True
+            ),
+            html.Div(id="tab-content"),
+
+            html.Button("🌙", id="theme-toggle", n_clicks=0, className="theme-btn"),
+            dcc.Checklist(id="live-toggle", options=[{"label": " Live", "value": "live"}], value=[]),
+            dcc.Interval(id="live-interval", interval=LIVE_INTERVAL_MS, disabled=True),
+            ]),
+        ],
+    )
 
 # -------------------
 # Callbacks
@@ -106,138 +160,463 @@ layout = html.Div(
      Input("date_filter", "end_date")]
 )
 def filter_and_store(selected_ops, selected_nts, start_date, end_date):
-    dff = df
-    if selected_ops:
-        dff = dff[dff["operator"].isin(selected_ops)]
-    if selected_nts:
-        dff = dff[dff["network_type"].isin(selected_nts)]
-    dff = dff[(dff["timestamp"] >= start_date) & (dff["timestamp"] <= end_date)]
-    return dff.to_dict("records")   # serialize for storage
+    get_dataset().refresh()  # picks up only partitions not seen yet
+    # Only the (normalized) filter state goes to the browser; rows stay on
+    # the server and are looked up per callback from the dataset's cache
+    return normalize_filters(selected_ops, selected_nts, start_date, end_date)
+
+
+def _theme(theme_class):
+    return "light" if theme_class == "light" else "dark"
+
+
+def _cached_figure(name, tab, filters, build):
+    key = (name, tab, filter_key(filters), get_dataset().version)
+    return FIGURES.get_or_build(key, lambda: pack_figure(build().to_plotly_json()))
+
+
+def _themed(fig, theme_class):
+    # Shallow copy so the cached figure itself is never modified
+    theme = _theme(theme_class)
+    layout = dict(fig["layout"], template=TEMPLATES[theme])
+    if "map" in layout:
+        layout["map"] = dict(layout["map"], style=MAP_STYLES[theme])
+    return dict(fig, layout=layout)
 
 
-# --- theme callback ---
 @callback(
+    Output("export-link", "href"),
+    Input("filtered-data", "data"),
+    Input("export-columns", "value"),
+    Input("export-format", "value"),
+)
+def update_export_link(filters, columns, fmt):
+    # Same filter state the charts use, as /api/export query parameters
+    params = {"format": fmt or "csv", "operator": filters["operators"], "network_type": filters["network_types"]}
+    if filters.get("start"):
+        params["start"] = filters["start"]
+    if filters.get("end"):
+        params["end"] = filters["end"]
+    if columns:
+        params["columns"] = ",".join(columns)
+    return "/api/export?" + urlencode(params, doseq=True)
+
+
+# --- theme callbacks (run in the browser, see assets/theme.js) ---
+dash.clientside_callback(
+    dash.ClientsideFunction(namespace="theme", function_name="toggle"),
     Output("theme-container", "className"),
     Output("theme-toggle", "children"),
     Input("theme-toggle", "n_clicks"),
     State("theme-container", "className"),
     prevent_initial_call=True,
 )
-def toggle_theme(n_clicks, current_theme):
-    if current_theme == "light":
-        return "dark", "☀️"
-    return "light", "🌙"
+
+for _graph in ["latency_trend", "drop_trend", "bandwidth_trend", "anomaly_scatter", "anomaly_rescored", "geo_map"]:
+    dash.clientside_callback(
+        dash.ClientsideFunction(namespace="theme", function_name="swap"),
+        Output(_graph, "figure", allow_duplicate=True),
+        Input("theme-container", "className"),
+        State(_graph, "figure"),
+        State("plot-templates", "data"),
+        prevent_initial_call=True,
+    )
 
 # --- Kpi callback ---
+def kpi_cards(avg_latency, dropped_calls, avg_bandwidth, avg_drop_rate):
+    return [
+        html.Div(className="kpi-card", children=[html.H3("Avg Latency"), html.H4(f"{avg_latency:.2f} sec")]),
+        html.Div(className="kpi-card", children=[html.H3("Total Dropped Calls"), html.H4(style={"color":"red"},children=[f"{dropped_calls}"])]),
+        html.Div(className="kpi-card", children=[html.H3("Avg Bandwidth"), html.H4(f"{avg_bandwidth/1e6:.2f} Mbps")]),
+        html.Div(className="kpi-card", children=[html.H3("Avg Drop Rate"), html.H4(style={'color':'red'},children=[f"{avg_drop_rate:.2f}%"])]),
+    ]
+
+def _live_kpis(filters):
+    # Live mode clears the date range (see toggle_live); until the cleared
+    # filters arrive, the cards keep the dated values rather than alternate
+    return not filters.get("start") and not filters.get("end")
+
+
 @callback(
     Output("kpi_cards", "children"),
-    Input("filtered-data", "data")
+    Input("filtered-data", "data"),
+    State("live-toggle", "value"),
 )
-def update_kpis(data):
-    dff = pd.DataFrame(data)
-    return [
-        html.Div(className="kpi-card", children=[html.H3("Avg Latency"), html.H4(f"{dff['latency_sec'].mean():.2f} sec")]),
-        html.Div(className="kpi-card", children=[html.H3("Total Dropped Calls"), html.H4(style={"color":"red"},children=[f"{dff['dropped_calls'].sum()}"])]),
-        html.Div(className="kpi-card", children=[html.H3("Avg Bandwidth"), html.H4(f"{dff['bandwidth_numeric'].mean()/1e6:.2f} Mbps")]),
-        html.Div(className="kpi-card", children=[html.H3("Avg Drop Rate"), html.H4(style={'color':'red'},children=[f"{dff['call_drop_rate'].mean():.2f}%"])]),
-    ]
+def update_kpis(filters, live=None):
+    # Same definition as live_kpis while live: history plus live rows, from
+    # the feed's running sums
+    if live and _live_kpis(filters):
+        return live_kpis(None, filters)
+    dff = get_dataset().filter(filters)
+    return kpi_cards(
+        dff['latency_sec'].mean(), dff['dropped_calls'].sum(),
+        dff['bandwidth_numeric'].mean(), dff['call_drop_rate'].mean(),
+    )
 
 # --- Trends callback ---
+def _trend_figures(dff, set_progress=None):
+    specs = [
+        ("latency_sec", "Latency Over Time"),
+        ("dropped_calls", "Dropped Calls Over Time"),
+        ("bandwidth_numeric", "Bandwidth Usage Over Time"),
+    ]
+    figs = []
+    for i, (y, title) in enumerate(specs):
+        fig = px.line(
+            dff,
+            x="timestamp",
+            y=y,
+            color="operator",
+            title=title,
+            custom_data=FEATURE_COLS
+        )
+        fig.update_layout(uirevision="constant")
+        figs.append(pack_figure(fig.to_plotly_json()))
+        if set_progress:
+            set_progress((str(i + 1), str(len(specs))))
+    return figs
+
+
+# Runs as a background job: identical (filters, theme, live, data) requests are
+# served from the shared disk cache, and a newer filter cancels this one. The
+# job runs in a forked process, so FIGURES (per process) can't keep what it
+# builds; the disk cache is what reuses trend figures across requests.
 @callback(
     [
     Output("latency_trend", "figure"),
     Output("drop_trend", "figure"),
     Output("bandwidth_trend", "figure"),
+    Output("live-traces", "data"),
+    Output("live-cursor", "data"),
     ],
-    [
     Input("filtered-data", "data"),
-    Input("theme-container", "className")],
+    [
+    State("theme-container", "className"),
+    State("live-toggle", "value")],
+    background=True,
+    progress=[Output("trends-progress", "value"), Output("trends-progress", "max")],
+    running=[(Output("trends-progress", "style"), {"display": "block"}, {"display": "none"})],
+    cancel=FILTER_INPUTS,
     prevent_initial_call=False
 )
-def update_latency(data, theme):
-    template = "plotly_dark" if theme == "dark" else "plotly_white"
-    dff = pd.DataFrame(data)
-    # Trends
-    latency_fig = px.line(
-        dff,
-        x="timestamp",
-        y="latency_sec",
-        color="operator",
-        title="Latency Over Time",
-        template=template,
-        custom_data=dff[FEATURE_COLS]  
+def update_latency(set_progress, filters, theme, live):
+    dff = get_dataset().filter(filters)
+    cursor = None
+    feed = current_feed() if live else None
+    if feed is not None:
+        # Rebuilds include what the live feed has already pushed (as of the
+        # fork), then deltas resume from the feed's head at that point
+        rows, head = feed.since(0)
+        if rows is not None:
+            live_rows = _filter_live(rows, filters["operators"], filters["network_types"])
+            dff = pd.concat([dff, live_rows], ignore_index=True)
+        cursor = {"epoch": feed.epoch, "seq": head}
+    figs = _trend_figures(dff, set_progress)
+    # Trace order (one per operator) so live deltas land on the right line;
+    # without a cursor live mode resyncs to the feed on its next tick
+    traces = [trace["name"] for trace in figs[0]["data"]]
+    return (*[_themed(fig, theme) for fig in figs], traces, cursor)
+
+
+# --- Live mode ---
+def _filter_live(rows, selected_ops, selected_nts):
+    if selected_ops:
+        rows = rows[rows["operator"].isin(selected_ops)]
+    if selected_nts:
+        rows = rows[rows["network_type"].isin(selected_nts)]
+    return rows
+
+
+def _trend_delta(rows, traces, y):
+    # extendData payload: new points per existing trace, capped at LIVE_WINDOW
+    xs, ys, custom, indices = [], [], [], []
+    for i, name in enumerate(traces):
+        part = rows[rows["operator"] == name]
+        if part.empty:
+            continue
+        indices.append(i)
+        xs.append(part["timestamp"].dt.strftime("%Y-%m-%d %H:%M:%S").tolist())
+        ys.append(part[y].tolist())
+        custom.append(part[FEATURE_COLS].to_numpy().tolist())
+    if not indices:
+        return dash.no_update
+    return [dict(x=xs, y=ys, customdata=custom), indices, LIVE_WINDOW]
+
+
+def _new_traces(rows, traces, y):
+    # Operators first seen live have no trace to extend: build theirs the way
+    # _trend_figures would, taking the next colours in the sequence
+    new = rows[~rows["operator"].isin(traces)]
+    if new.empty:
+        return []
+    colors = px.colors.qualitative.Plotly
+    start = len(traces) % len(colors)
+    fig = px.line(
+        new, x="timestamp", y=y, color="operator", custom_data=FEATURE_COLS,
+        color_discrete_sequence=colors[start:] + colors[:start],
     )
-    drop_fig = px.line(
-        dff,
-        x="timestamp",
-        y="dropped_calls",
-        color="operator",
-        title="Dropped Calls Over Time",
-        template=template,
-        custom_data=dff[FEATURE_COLS]  
+    return fig.to_plotly_json()["data"]
+
+
+def _add_traces(new):
+    if not new:
+        return dash.no_update
+    patch = dash.Patch()
+    for trace in new:
+        patch["data"].append(trace)
+    return patch
+
+
+@callback(
+    Output("live-interval", "disabled"),
+    Output("date_filter", "disabled"),
+    Output("date_filter", "start_date"),
+    Output("date_filter", "end_date"),
+    Input("live-toggle", "value"),
+    prevent_initial_call=True,
+)
+def toggle_live(live):
+    # Live rows run past any fixed end date: live mode shows everything and
+    # the date range is cleared and locked until it is turned off
+    dataset = get_dataset()
+    if live:
+        get_feed(dataset)  # starts the feed on first use
+        return False, True, None, None
+    start_date, end_date = dataset.time_range()
+    return True, False, start_date, end_date
+
+
+@callback(
+    Output("latency_trend", "extendData"),
+    Output("drop_trend", "extendData"),
+    Output("bandwidth_trend", "extendData"),
+    Output("latency_trend", "figure", allow_duplicate=True),
+    Output("drop_trend", "figure", allow_duplicate=True),
+    Output("bandwidth_trend", "figure", allow_duplicate=True),
+    Output("live-traces", "data", allow_duplicate=True),
+    Output("live-cursor", "data", allow_duplicate=True),
+    Input("live-interval", "n_intervals"),
+    State("live-cursor", "data"),
+    State("live-traces", "data"),
+    State("filtered-data", "data"),
+    prevent_initial_call=True,
+)
+def live_trends(n_intervals, cursor, traces, filters):
+    feed = get_feed(get_dataset())
+    if not cursor or cursor["epoch"] != feed.epoch:
+        # Another worker's feed (or first tick): resync without replaying
+        return (*[dash.no_update] * 7, {"epoch": feed.epoch, "seq": feed.head})
+    rows, head = feed.since(cursor["seq"])
+    if rows is None:
+        raise dash.exceptions.PreventUpdate
+    rows = _filter_live(rows, filters["operators"], filters["network_types"])
+    traces = traces or []
+    ys = ["latency_sec", "dropped_calls", "bandwidth_numeric"]
+    # New operators' traces are appended after the existing ones (same order
+    # in all three figures), so existing trace indices stay valid
+    new = [_new_traces(rows, traces, y) for y in ys]
+    names = traces + [trace["name"] for trace in new[0]]
+    return (
+        *[_trend_delta(rows, traces, y) for y in ys],
+        *[_add_traces(traces_for_y) for traces_for_y in new],
+        names if new[0] else dash.no_update,
+        {"epoch": feed.epoch, "seq": head},
     )
-    bandwidth_fig = px.line(
+
+
+@callback(
+    Output("kpi_cards", "children", allow_duplicate=True),
+    Input("live-interval", "n_intervals"),
+    State("filtered-data", "data"),
+    prevent_initial_call=True,
+)
+def live_kpis(n_intervals, filters):
+    # Running sums over history + live rows (the date range is cleared in live mode)
+    if not _live_kpis(filters):
+        raise dash.exceptions.PreventUpdate
+    k = get_feed(get_dataset()).kpis(filters["operators"], filters["network_types"])
+    return kpi_cards(k["latency_sec"], k["dropped_calls"], k["bandwidth_numeric"], k["call_drop_rate"])
+
+
+# --- Anomaly callback ---
+def _anomaly_points(dff):
+    fig = px.scatter(
         dff,
-        x="timestamp",
-        y="bandwidth_numeric",
-        color="operator",
-        title="Bandwidth Usage Over Time",
-        template=template,
-        custom_data=dff[FEATURE_COLS]  
+        x="latency_sec", y="call_drop_rate",
+        color="anomaly", size="bandwidth_numeric",
+        hover_data=["tower_id", "operator", "network_type", "cluster"],
+        title="Anomaly Detection: Latency vs Call Drop Rate",
+        render_mode="webgl",
     )
-    for fig in [latency_fig,drop_fig,bandwidth_fig]:
-        fig.update_layout(uirevision="constant")
+    fig.update_layout(uirevision="constant")
+    return fig
 
-    return latency_fig,drop_fig,bandwidth_fig
+
+def _view_range(relayout):
+    """((x0, x1), (y0, y1)) from a zoom/pan relayout event; None for autorange."""
+    if not relayout or "xaxis.range[0]" not in relayout and "yaxis.range[0]" not in relayout:
+        return None
+    view = []
+    for axis in ("xaxis", "yaxis"):
+        if f"{axis}.range[0]" in relayout:
+            # rounded so nearly identical views share a cache entry
+            view.append((float(f"{relayout[f'{axis}.range[0]']:.6g}"), float(f"{relayout[f'{axis}.range[1]']:.6g}")))
+        else:
+            view.append(None)
+    return tuple(view)
+
+
+def _anomaly_density(dff, view):
+    # Rasterized view: anomaly share per latency x drop-rate cell, with only
+    # the anomalous rows drawn as points on top
+    x = dff["latency_sec"].to_numpy(dtype=float)
+    y = dff["call_drop_rate"].to_numpy(dtype=float)
+    flag = (dff["anomaly"] == "Anomaly").to_numpy()
+    x_range, y_range = view or (None, None)
+
+    inside = np.ones(len(dff), dtype=bool)
+    if x_range:
+        inside &= (x >= x_range[0]) & (x <= x_range[1])
+    if y_range:
+        inside &= (y >= y_range[0]) & (y <= y_range[1])
+    if view and inside.sum() <= ZOOM_POINTS:
+        # Zoomed into a small region: every point is cheap enough to draw
+        fig = _anomaly_points(dff[inside])
+        return fig.update_layout(xaxis_range=x_range, yaxis_range=y_range)
+
+    counts, share, xc, yc = bin_share(x, y, flag, DENSITY_BINS, x_range, y_range)
+    fig = go.Figure(go.Heatmap(
+        x=xc, y=yc, z=share.astype(np.float32), customdata=counts.astype(np.int32),
+        zmin=0, zmax=1, colorscale="YlOrRd", colorbar=dict(title="Anomaly share"),
+        hovertemplate="latency_sec=%{x:.3f}<br>call_drop_rate=%{y:.2f}<br>rows=%{customdata}<br>anomaly share=%{z:.1%}<extra></extra>",
+    ))
+    anomalies = dff[flag & inside]
+    if len(anomalies) > MAX_ANOMALY_POINTS:
+        anomalies = anomalies.sample(MAX_ANOMALY_POINTS, random_state=0)
+    fig.add_trace(go.Scattergl(
+        x=anomalies["latency_sec"], y=anomalies["call_drop_rate"],
+        mode="markers", name="Anomaly", marker=dict(size=4, color="#d62728"),
+        customdata=anomalies[["tower_id", "operator"]].to_numpy(),
+        hovertemplate="tower_id=%{customdata[0]}<br>operator=%{customdata[1]}<extra>Anomaly</extra>",
+    ))
+    fig.update_layout(
+        title=f"Anomaly Density: Latency vs Call Drop Rate ({inside.sum():,} rows)",
+        xaxis_title="latency_sec", yaxis_title="call_drop_rate",
+        uirevision="constant",
+    )
+    if view:
+        fig.update_layout(xaxis_range=x_range, yaxis_range=y_range)
+    return fig
+
+
+def _anomaly_figure(filters, mode, view, zoom=False):
+    """Points or density figure for the current filters; None if a zoom needs no update."""
+    dff = get_dataset().filter(filters)
+    if mode == "points" or mode != "density" and len(dff) <= DENSITY_MIN_ROWS:
+        return None if zoom else _cached_figure("anomaly_scatter", "anomalies", filters, lambda: _anomaly_points(dff))
+    return _cached_figure(f"anomaly_density:{view}", "anomalies", filters, lambda: _anomaly_density(dff, view))
 
 
-# --- Anomaly callback ---
 @callback(
     Output("anomaly_scatter", "figure"),
-    [
     Input("filtered-data", "data"),
-    Input("theme-container", "className")]
+    Input("anomaly-mode", "value"),
+    State("theme-container", "className")
+)
+def update_anomaly(filters, mode="auto", theme_class="dark"):
+    return _themed(_anomaly_figure(filters, mode, None), theme_class)
+
+
+# Zoom/pan in the density view re-bins (or switches to points) for the
+# visible region; the plain scatter zooms in the browser only
+@callback(
+    Output("anomaly_scatter", "figure", allow_duplicate=True),
+    Input("anomaly_scatter", "relayoutData"),
+    State("filtered-data", "data"),
+    State("anomaly-mode", "value"),
+    State("theme-container", "className"),
+    prevent_initial_call=True
+)
+def zoom_anomaly(relayout, filters, mode, theme_class):
+    view = _view_range(relayout)
+    if view is None and not any(key.endswith("autorange") for key in relayout or {}):
+        raise dash.exceptions.PreventUpdate  # not a zoom/pan/reset event
+    fig = _anomaly_figure(filters, mode, view, zoom=True)
+    if fig is None:
+        raise dash.exceptions.PreventUpdate
+    return _themed(fig, theme_class)
+
+# --- Anomaly re-scoring (background) ---
+@callback(
+    Output("rescore-output", "children"),
+    Input("rescore-btn", "n_clicks"),
+    State("filtered-data", "data"),
+    State("theme-container", "className"),
+    background=True,
+    progress=[Output("rescore-progress", "value"), Output("rescore-progress", "max")],
+    running=[
+        (Output("rescore-btn", "disabled"), True, False),
+        (Output("rescore-progress", "style"), {"display": "block"}, {"display": "none"}),
+    ],
+    cancel=FILTER_INPUTS,
+    cache_args_to_ignore=[0],
+    prevent_initial_call=True,
 )
-def update_anomaly(data,theme_class="dark"):
-    template = "plotly_dark" if theme_class == "dark" else "plotly_white"
-    dff = pd.DataFrame(data)
+def rescore_anomalies(set_progress, n_clicks, filters, theme_class):
+    # Fit a fresh IsolationForest on just the filtered subset (sklearn is
+    # imported here, not at boot)
+    from anomaly_detection_model import detect_anomalies
 
+    set_progress(("0", "3"))
+    dataset = get_dataset()
+    dff = dataset.filter(filters)
+    if len(dff) < MIN_RESCORE_ROWS:
+        return html.P(f"Need at least {MIN_RESCORE_ROWS} rows to re-score (have {len(dff)}).")
+    set_progress(("1", "3"))
+    # Model input straight from the feature store where it holds the rows
+    features = dataset.feature_block(ANOMALY_COLS, dff.index)
+    scored, _ = detect_anomalies(dff.drop(columns=["anomaly"]), features)
+    set_progress(("2", "3"))
+    changed = int((scored["anomaly"].to_numpy() != dff["anomaly"].to_numpy()).sum())
     fig = px.scatter(
-        dff,
+        scored,
         x="latency_sec", y="call_drop_rate",
-        color="anomaly", size="bandwidth_numeric",
-        hover_data=["tower_id", "operator", "network_type"],
-        title="Anomaly Detection: Latency vs Call Drop Rate",
-        template=template,
+        color="anomaly",
+        hover_data=["tower_id", "operator", "network_type", "cluster"],
+        title="Re-scored Anomalies (filtered subset)",
         render_mode="webgl",
     )
     fig.update_layout(uirevision="constant")
-    return fig
+    set_progress(("3", "3"))
+    return [
+        html.P(
+            f"Re-scored {len(scored)} rows: {(scored['anomaly'] == 'Anomaly').sum()} anomalies, "
+            f"{changed} labels differ from the fleet-wide model."
+        ),
+        dcc.Graph(id="anomaly_rescored", figure=_themed(fig.to_plotly_json(), theme_class)),
+    ]
 
 # --- Geo callback ---
 @callback(
     Output("geo_map", "figure"),
-    [
-        Input("filtered-data", "data"),
-        Input("theme-container", "className")
-    ]
+    Input("filtered-data", "data"),
+    State("theme-container", "className")
 )
-def update_geo(data, theme_class="dark"):
-    template = "plotly_dark" if theme_class == "dark" else "plotly_white"
-    dff = pd.DataFrame(data)
+def update_geo(filters, theme_class="dark"):
+    def build():
+        dff = get_dataset().filter(filters)
+        fig = px.scatter_map(
+            dff,
+            lat="location.latitude", lon="location.longitude",
+            color="latency_sec", size="users_connected",
+            hover_data=["tower_id", "operator", "call_drop_rate", "cluster"],
+            title="Geospatial Tower Performance",
+            zoom=5,
+        )
+        fig.update_layout(uirevision="constant")
+        return fig
 
-    fig = px.scatter_map(
-        dff,
-        lat="location.latitude", lon="location.longitude",
-        color="latency_sec", size="users_connected",
-        hover_data=["tower_id", "operator", "call_drop_rate"],
-        title="Geospatial Tower Performance",
-        zoom=5,
-        template=template,
-        map_style="carto-positron" if theme_class == "light" else "carto-darkmatter",
-    )
-    fig.update_layout(uirevision="constant")
-    return fig
+    return _themed(_cached_figure("geo_map", "geo", filters, build), theme_class)
 
 
 # --- tabs callback ---
@@ -246,13 +625,30 @@ def render_tab(tab):
     if tab == "trends":
         return [
             dcc.Store(id="selected-tower-data"),   
+            dcc.Store(id="live-traces"),
+            dcc.Store(id="live-cursor"),
             dcc.Location(id="url", refresh = True),
+            html.Progress(id="trends-progress", style={"display": "none"}),
             dcc.Graph(id="latency_trend"),
             dcc.Graph(id="drop_trend"),
             dcc.Graph(id="bandwidth_trend"),
         ]
     elif tab == "anomalies":
-        return dcc.Graph(id="anomaly_scatter")
+        return [
+            dcc.RadioItems(
+                id="anomaly-mode",
+                options=[
+                    {"label": " Auto", "value": "auto"},
+                    {"label": " Points", "value": "points"},
+                    {"label": " Density", "value": "density"},
+                ],
+                value="auto", inline=True, persistence=True,
+            ),
+            dcc.Graph(id="anomaly_scatter"),
+            html.Button("Re-score filtered subset", id="rescore-btn", n_clicks=0),
+            html.Progress(id="rescore-progress", style={"display": "none"}),
+            html.Div(id="rescore-output"),
+        ]
     elif tab == "geo":
         return dcc.Graph(id="geo_map")
     return []
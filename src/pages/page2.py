@@ -1,4 +1,6 @@
 import pickle
+import threading
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import os 
@@ -7,55 +9,63 @@ import dash #type: ignore
 from dash import html, dcc, Input, Output, State, callback #type: ignore
 import dash_bootstrap_components as dbc #type:ignore
 
-dash.register_page(__name__, path="/page2")
-
+from dataset import get_dataset
+from feature_store import FEATURE_COLS, load_feature_store
+from paths import FINAL_PATH
+from startup import add_warmup, timed
 
-# Get the current file's directory
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+dash.register_page(__name__, path="/page2")
 
-# Build full path to your CSV
-DATA_PATH = os.path.join(BASE_DIR,"final_data.csv")
 
-# Load data
-df = pd.read_csv(DATA_PATH)
+# The served final_data.csv (see paths.py)
+DATA_PATH = FINAL_PATH
 
 # ------------------------- User-configurable section -------------------------
 MODEL_PATH = Path("model/tower_optimization_model.pkl")
-
-# Feature names must match the model's expected order / names
-FEATURE_COLS = [
-    'latency_sec', 'bandwidth_mbps', 'dropped_calls', 'total_calls',
-    'uptime_percent', 'users_connected', 'download_speed_mbps', 'upload_speed_mbps',
-    'signal_strength.RSSI', 'signal_strength.RSRP', 'signal_strength.SINR',
-    'tower_load_percent', 'average_call_duration_sec', 'handover_success_rate',
-    'packet_loss_percent', 'jitter_ms', 'tower_temperature_c', 'battery_backup_hours',
-    'tower_age_years'
-]
-
-FEATURE_RANGES = {}
-for col in FEATURE_COLS:
-    if col in df.columns:
-        min_val = float(df[col].min())
-        max_val = float(df[col].max())
-        default_val = float(df[col].median())  # could also use mean()
-        FEATURE_RANGES[col] = (min_val, max_val, default_val)
 # -----------------------------------------------------------------------------
 
-# Load model (safe handling)
-model = None
-model_load_error = None
-if MODEL_PATH.exists():
+# The model and the input ranges load on first use (or in the warm-up at
+# boot, see startup.py), not when the page module is imported
+_model = None
+_model_lock = threading.Lock()
+_feature_ranges = None
+_feature_ranges_lock = threading.Lock()
+
+
+def _load_model():
+    if not MODEL_PATH.exists():
+        return None, f"Model file not found at {MODEL_PATH.resolve()}"
     try:
         with open(MODEL_PATH, 'rb') as f:
-            model = pickle.load(f)
+            return pickle.load(f), None
     except Exception as e:
-        model_load_error = str(e)
-else:
-    model_load_error = f"Model file not found at {MODEL_PATH.resolve()}"
+        return None, str(e)
+
+
+@add_warmup
+def get_model():
+    """(model, load error message); the pickle is read once per process."""
+    global _model
+    with _model_lock:
+        if _model is None:
+            with timed("page2 model"):
+                _model = _load_model()
+    return _model
+
+
+@add_warmup
+def feature_ranges():
+    """(min, max, default) per feature from the shared feature store; default is the median."""
+    global _feature_ranges
+    with _feature_ranges_lock:
+        if _feature_ranges is None:
+            with timed("page2 feature ranges"):
+                _feature_ranges = load_feature_store(source_path=DATA_PATH).ranges(FEATURE_COLS)
+    return _feature_ranges
 
 # Helper to build a form row (label + numeric input)
 def build_input_row(feature_name: str):
-    low, high, default = FEATURE_RANGES.get(feature_name, (None, None, None))
+    low, high, default = feature_ranges().get(feature_name, (None, None, None))
     input_id = {'type': 'feature-input', 'index': feature_name}
     # Using dbc.Input so we get nice styling; type='number'
     return dbc.Row([
@@ -71,46 +81,102 @@ def build_input_row(feature_name: str):
         ), width=7)
     ], className="mb-2")
 
-# Build the form with all features
-form_children = []
-for feat in FEATURE_COLS:
-    form_children.append(build_input_row(feat))
-
-# App layout
-layout = dbc.Container(
-    className="dark",
-    id="theme-container",
-    children=[
-        
-    dcc.Store(id="selected-tower-data"),  
-    html.H2("Tower Optimization Predictor", className="my-3"),
-
-    dbc.Alert(
-        f"Model load error: {model_load_error}",
-        color="danger",
-        id="model-error-alert",
-        is_open=bool(model_load_error),
-        style={"whiteSpace": "pre-wrap"}
-    ),
-
-    dbc.Card([
-        dbc.CardBody([
-            html.H5("Enter performance metrics"),
-            html.Div(form_children, id='feature-form'),
+# Positive-class ("needs optimization") column of predict_proba
+def positive_index(proba):
+    model, _ = get_model()
+    if hasattr(model, 'classes_'):
+        classes = list(model.classes_)
+        if 1 in classes:
+            return classes.index(1)
+        elif 'yes' in classes:
+            return classes.index('yes')
+    # fallback to second column
+    return 1 if proba.shape[1] > 1 else 0
+
+
+def model_input(x):
+    # A float32 FEATURE_COLS block (from the feature store, or built once)
+    # keeps the names the model was fitted with without copying the array
+    if isinstance(x, np.ndarray):
+        return pd.DataFrame(x, columns=FEATURE_COLS, copy=False)
+    return x
+
+
+def flag_towers(x):
+    # Boolean "needs optimization" per row, batched over the whole frame
+    model, _ = get_model()
+    x = model_input(x)
+    if hasattr(model, 'predict_proba'):
+        proba = model.predict_proba(x)
+        return proba[:, positive_index(proba)] >= 0.5
+    pred = pd.Series(model.predict(x))
+    return pred.isin([1, 'yes', 'true', True]).to_numpy()
+
+# App layout (built per page load, so nothing is read until the page is used)
+def layout(**kwargs):
+    _, model_load_error = get_model()
+    # Build the form with all features
+    form_children = []
+    for feat in FEATURE_COLS:
+        form_children.append(build_input_row(feat))
+
+    return dbc.Container(
+        className="dark",
+        id="theme-container",
+        children=[
+
+        dcc.Store(id="selected-tower-data"),  
+        html.H2("Tower Optimization Predictor", className="my-3"),
 
-            dbc.Row([
-                dbc.Col(dbc.Button("Predict", id='predict-btn', color='primary'), width='auto'),
-                dbc.Col(dbc.Button("Reset to defaults", id='reset-btn', color='secondary', outline=True), width='auto')
-            ], className='mt-3'),
+        dbc.Alert(
+            f"Model load error: {model_load_error}",
+            color="danger",
+            id="model-error-alert",
+            is_open=bool(model_load_error),
+            style={"whiteSpace": "pre-wrap"}
+        ),
 
-            html.Hr(),
+        dbc.Card([
+            dbc.CardBody([
+                html.H5("Enter performance metrics"),
+                html.Div(form_children, id='feature-form'),
 
-            dbc.Row([
-                dbc.Col(html.Div(id='prediction-output'), width=12)
+                dbc.Row([
+                    dbc.Col(dbc.Button("Predict", id='predict-btn', color='primary'), width='auto'),
+                    dbc.Col(dbc.Button("Reset to defaults", id='reset-btn', color='secondary', outline=True), width='auto')
+                ], className='mt-3'),
+
+                html.Hr(),
+
+                dbc.Row([
+                    dbc.Col(html.Div(id='prediction-output'), width=12)
+                ])
             ])
-        ])
-    ], className='mb-4'),
-], fluid=True)
+        ], className='mb-4'),
+
+        dbc.Card([
+            dbc.CardBody([
+                html.H5("Fleet what-if"),
+                html.P("Apply a change to one metric on every tower's latest reading and compare how many towers are flagged."),
+                dbc.Row([
+                    dbc.Col(dcc.Dropdown(
+                        id='whatif-feature',
+                        options=[{'label': f, 'value': f} for f in FEATURE_COLS],
+                        value=FEATURE_COLS[0],
+                        clearable=False
+                    ), width=5),
+                    dbc.Col(dbc.InputGroup([
+                        dbc.Input(id='whatif-change', type='number', value=-10, step=1),
+                        dbc.InputGroupText("%")
+                    ]), width=3),
+                    dbc.Col(dbc.Button("Run what-if", id='whatif-btn', color='primary'), width='auto'),
+                    dbc.Col(dbc.Button("Cancel", id='whatif-cancel', color='secondary', outline=True), width='auto'),
+                ], className='mb-2'),
+                html.Progress(id='whatif-progress', style={'display': 'none', 'width': '100%'}),
+                html.Div(id='whatif-output'),
+            ])
+        ], className='mb-4'),
+    ], fluid=True)
 
 # Callback: reset button sets inputs back to defaults
 @callback(
@@ -120,7 +186,8 @@ layout = dbc.Container(
 )
 def reset_defaults(n_clicks):
     # Return default values in the same order as FEATURE_COLS
-    return [FEATURE_RANGES.get(f, (None, None, None))[2] for f in FEATURE_COLS]
+    ranges = feature_ranges()
+    return [ranges.get(f, (None, None, None))[2] for f in FEATURE_COLS]
 
 # Prediction callback
 @callback(
@@ -131,6 +198,7 @@ def reset_defaults(n_clicks):
 )
 def predict(n_clicks, values):
     # values is a list aligned to FEATURE_COLS order
+    model, model_load_error = get_model()
     if model is None:
         return dbc.Alert(f"No model loaded. {model_load_error}", color='danger')
 
@@ -140,7 +208,9 @@ def predict(n_clicks, values):
 
     # Build DataFrame for the model
     try:
-        x = pd.DataFrame([values], columns=FEATURE_COLS)
+        # Typed-in values, not stored rows: built once as the float32 block
+        # the model predicts on
+        x = model_input(np.array([values], dtype=np.float32))
         # If model expects specific dtypes or scaling, ensure those pre-processing steps happen here.
         # For example: x = scaler.transform(x) if you saved a scaler separately.
     except Exception as e:
@@ -150,18 +220,8 @@ def predict(n_clicks, values):
     try:
         if hasattr(model, 'predict_proba'):
             proba = model.predict_proba(x)
-            # assume class 1 is positive (needs optimization). Find index of class 1 if classes_ present
-            if hasattr(model, 'classes_'):
-                classes = list(model.classes_)
-                if 1 in classes:
-                    idx = classes.index(1)
-                elif 'yes' in classes:
-                    idx = classes.index('yes')
-                else:
-                    # fallback to second column
-                    idx = 1 if proba.shape[1] > 1 else 0
-            else:
-                idx = 1 if proba.shape[1] > 1 else 0
+            # assume class 1 is positive (needs optimization)
+            idx = positive_index(proba)
 
             score = float(proba[0, idx])
             label = "The tower needs optimization" if score >= 0.5 else "No optimization needed"
@@ -188,6 +248,63 @@ def predict(n_clicks, values):
             color='danger'
         )
 
+# Fleet what-if: runs as a background job (can take a while on a large fleet);
+# the result for the same feature/change and data is served from the cache
+@callback(
+    Output('whatif-output', 'children'),
+    Input('whatif-btn', 'n_clicks'),
+    State('whatif-feature', 'value'),
+    State('whatif-change', 'value'),
+    background=True,
+    progress=[Output('whatif-progress', 'value'), Output('whatif-progress', 'max')],
+    running=[
+        (Output('whatif-btn', 'disabled'), True, False),
+        (Output('whatif-progress', 'style'), {'display': 'block', 'width': '100%'}, {'display': 'none'}),
+    ],
+    cancel=[Input('whatif-cancel', 'n_clicks')],
+    cache_args_to_ignore=[0],
+    prevent_initial_call=True
+)
+def fleet_whatif(set_progress, n_clicks, feature, change):
+    model, model_load_error = get_model()
+    if model is None:
+        return dbc.Alert(f"No model loaded. {model_load_error}", color='danger')
+    if feature not in FEATURE_COLS or change is None:
+        return dbc.Alert("Pick a metric and a % change.", color='warning')
+
+    set_progress(("0", "3"))
+    # Each tower's latest reading: one grouped pass, no sort of the history
+    dataset = get_dataset()
+    frame = dataset.frame
+    latest = frame.loc[frame.groupby('tower_id')['timestamp'].idxmax()]
+    # Gathered from the feature store; copied from the frame if a tower's
+    # latest reading was appended after the base file
+    x = dataset.feature_block(FEATURE_COLS, latest.index)
+    if x is None:
+        x = latest[FEATURE_COLS].to_numpy(dtype=np.float32)
+    medians = np.array([feature_ranges()[f][2] for f in FEATURE_COLS], dtype=np.float32)
+    if np.isnan(x).any():
+        x = np.where(np.isnan(x), medians, x)
+    try:
+        set_progress(("1", "3"))
+        before = flag_towers(x)
+        adjusted = x.copy()
+        adjusted[:, FEATURE_COLS.index(feature)] *= 1 + change / 100
+        set_progress(("2", "3"))
+        after = flag_towers(adjusted)
+    except Exception as e:
+        return dbc.Alert([html.Div("What-if failed:"), html.Pre(str(e))], color='danger')
+    set_progress(("3", "3"))
+
+    fixed = int((before & ~after).sum())
+    new = int((~before & after).sum())
+    return dbc.Card([
+        dbc.CardBody([
+            html.H4(f"{int(after.sum())} of {len(x)} towers flagged (was {int(before.sum())})"),
+            html.P(f"{feature} {change:+g}%: {fixed} towers no longer need optimization, {new} newly flagged."),
+        ])
+    ], color='light')
+
 # @callback(
 #     [Output({"type": "feature-input", "index": col}, "value") for col in FEATURE_COLS],
 #     Input("selected-tower-data", "data"),
@@ -197,4 +314,4 @@ def predict(n_clicks, values):
 #     if not selected_row:
 #         raise dash.exceptions.PreventUpdate
 #     # return values in the same order as FEATURE_COLS
-#     return [selected_row.get(col, FEATURE_RANGES[col][2]) for col in FEATURE_COLS]
\ No newline at end of file
+#     return [selected_row.get(col, feature_ranges()[col][2]) for col in FEATURE_COLS]
\ No newline at end of file
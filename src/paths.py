@@ -0,0 +1,24 @@
+"""
+Where the served data lives.
+
+src/pages/final_data.csv is the snapshot tracked with the repo, so a fresh
+checkout serves data at once. The pipeline (pipeline.py) never writes over
+tracked files: its outputs go to data/generated/ (git-ignored), and once it
+has produced a final_data.csv there, the app serves that one instead.
+"""
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, ".."))
+GENERATED_DIR = os.path.join(ROOT_DIR, "data", "generated")
+
+BUNDLED_FINAL_PATH = os.path.join(BASE_DIR, "pages", "final_data.csv")
+GENERATED_FINAL_PATH = os.path.join(GENERATED_DIR, "final_data.csv")
+
+
+def final_path():
+    """The pipeline's final_data.csv if it has written one, else the tracked snapshot."""
+    return GENERATED_FINAL_PATH if os.path.exists(GENERATED_FINAL_PATH) else BUNDLED_FINAL_PATH
+
+
+FINAL_PATH = final_path()   # resolved once per process
@@ -0,0 +1,271 @@
+"""
+Content-hash cached pipeline: generate -> clean -> detect -> (cluster, forecast, serve).
+
+Each stage declares its input and output files. A stage's cache key is a hash
+of its input file contents, its parameters and the source of the code that
+implements it. Outputs are kept in a content-addressed object store under
+.cache/pipeline, so a stage whose key was seen before is restored instead of
+recomputed, and an up-to-date stage is skipped altogether. Stages whose
+dependencies are done run concurrently.
+
+    python src/pipeline.py                 # run what changed
+    python src/pipeline.py --force detect  # rerun one stage (and downstream)
+    python src/pipeline.py --rows 50000 --jobs 4
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, ".."))
+CACHE_DIR = os.path.join(ROOT_DIR, ".cache", "pipeline")
+
+sys.path.insert(0, BASE_DIR)
+
+import anomaly_detection_model  # noqa: E402
+import clustering  # noqa: E402
+import feature_store  # noqa: E402
+import forecasting  # noqa: E402
+from data_scripts import cleaner, generator  # noqa: E402
+from paths import GENERATED_DIR, GENERATED_FINAL_PATH  # noqa: E402
+
+log = logging.getLogger("pipeline")
+
+HASH_BLOCK = 1 << 20
+
+
+@dataclass
+class Stage:
+    name: str
+    func: object                    # func(inputs, outputs, **params)
+    inputs: list
+    outputs: list
+    code: list = field(default_factory=list)   # modules implementing the stage
+    params: dict = field(default_factory=dict)
+
+    def code_version(self):
+        h = hashlib.sha256(inspect.getsource(self.func).encode())
+        for module in self.code:
+            with open(inspect.getsourcefile(module), "rb") as f:
+                h.update(f.read())
+        return h.hexdigest()
+
+
+# -------------------
+# Stage implementations
+# -------------------
+def generate(inputs, outputs, num_rows, seed):
+    random.seed(seed)
+    generator.write_data(outputs[0], num_rows)
+
+
+def clean(inputs, outputs):
+    cleaner.clean_file(inputs[0], outputs[0])
+
+
+def detect(inputs, outputs):
+    anomaly_detection_model.run(inputs[0], outputs[0], outputs[1])
+
+
+def cluster(inputs, outputs):
+    model = clustering.fit_clusters(lambda: clustering.iter_feature_chunks(inputs[0]))
+    clustering.save_clusters(model, outputs[0])
+
+
+def forecast(inputs, outputs):
+    # Continues from the state the previous run left at outputs[1] when the
+    # new data only appends hours to it (see forecasting.py)
+    _, _, timings, modes = forecasting.run(inputs[0], outputs[0], outputs[1])
+    log.info("forecast: fleet %s", ", ".join(f"{c} {modes[c]} {t:.3f}s" for c, t in timings.items()))
+
+
+def serve(inputs, outputs):
+    # Warm the memory-mapped feature store the app will open at boot
+    store = feature_store.load_feature_store(source_path=inputs[0])
+    with open(outputs[0], "w") as f:
+        json.dump({"source": inputs[0], "rows": len(store), "columns": store.columns}, f)
+
+
+def default_stages(num_rows=9000, seed=42):
+    # Written under data/generated (git-ignored), never over the tracked copies
+    raw = os.path.join(GENERATED_DIR, "telecom_tower_usaged.json")
+    cleaned = os.path.join(GENERATED_DIR, "cleaned_telecom_data.csv")
+    final = GENERATED_FINAL_PATH
+    return [
+        Stage("generate", generate, [], [raw], [generator],
+              {"num_rows": num_rows, "seed": seed}),
+        Stage("clean", clean, [raw], [cleaned], [cleaner]),
+        Stage("detect", detect, [cleaned],
+              [final, anomaly_detection_model.ANOMALY_MODEL_PATH],
+              [anomaly_detection_model, feature_store]),
+        Stage("cluster", cluster, [final], [clustering.CLUSTER_PATH],
+              [clustering, feature_store]),
+        Stage("forecast", forecast, [final],
+              [forecasting.FORECAST_PATH, forecasting.STATE_PATH], [forecasting]),
+        Stage("serve", serve, [final], [os.path.join(CACHE_DIR, "serve.json")],
+              [feature_store]),
+    ]
+
+
+# -------------------
+# Runner
+# -------------------
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _file_sig(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _place(src, dst):
+    # Copy rather than hard link: a link would let a later in-place write to
+    # an output change the cached object too. Written to a temp file and
+    # renamed, so an interrupted copy never looks like a complete one.
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+
+
+class Pipeline:
+    def __init__(self, stages, cache_dir=CACHE_DIR, jobs=None):
+        self.stages = {s.name: s for s in stages}
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.manifest_path = os.path.join(cache_dir, "manifest.json")
+        self.jobs = jobs or min(4, os.cpu_count() or 1)
+        producers = {out: s.name for s in stages for out in s.outputs}
+        self.deps = {
+            s.name: {producers[i] for i in s.inputs if i in producers}
+            for s in stages
+        }
+        self.manifest = self._read_manifest()
+        self.stats = {}
+
+    def _read_manifest(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        return {}
+
+    def _write_manifest(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = f"{self.manifest_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, self.manifest_path)
+
+    def cache_key(self, stage):
+        h = hashlib.sha256(stage.name.encode())
+        h.update(stage.code_version().encode())
+        h.update(json.dumps(stage.params, sort_keys=True).encode())
+        for path in stage.inputs:
+            h.update(file_digest(path).encode())
+        return h.hexdigest()
+
+    def _up_to_date(self, stage, key):
+        entry = self.manifest.get(stage.name)
+        if not entry or entry["key"] != key:
+            return False
+        return all(
+            os.path.exists(p) and _file_sig(p) == entry["outputs"].get(p)
+            for p in stage.outputs
+        )
+
+    def _object_paths(self, key, stage):
+        return [os.path.join(self.objects_dir, key, f"{i}-{os.path.basename(p)}")
+                for i, p in enumerate(stage.outputs)]
+
+    def run_stage(self, stage, force=False):
+        start = time.perf_counter()
+        key = self.cache_key(stage)
+        bytes_in = sum(os.path.getsize(p) for p in stage.inputs)
+        objects = self._object_paths(key, stage)
+
+        if not force and self._up_to_date(stage, key):
+            status = "skipped"
+        elif not force and all(os.path.exists(o) for o in objects):
+            for obj, out in zip(objects, stage.outputs):
+                _place(obj, out)
+            status = "restored"
+        else:
+            for out in stage.outputs:
+                os.makedirs(os.path.dirname(out), exist_ok=True)
+            stage.func(stage.inputs, stage.outputs, **stage.params)
+            for out, obj in zip(stage.outputs, objects):
+                _place(out, obj)
+            status = "ran"
+
+        bytes_out = sum(os.path.getsize(p) for p in stage.outputs)
+        elapsed = time.perf_counter() - start
+        self.stats[stage.name] = {
+            "status": status, "seconds": round(elapsed, 3),
+            "bytes_in": bytes_in, "bytes_out": bytes_out,
+        }
+        log.info("%-8s %-8s %7.2fs  in=%s out=%s", stage.name, status, elapsed,
+                 _fmt_bytes(bytes_in), _fmt_bytes(bytes_out))
+        return key
+
+    def run(self, force=()):
+        """Run every stage once its dependencies are done; returns per-stage stats."""
+        forced = set(force)
+        done, running = set(), {}
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while len(done) < len(self.stages):
+                for name, stage in self.stages.items():
+                    if name in done or name in running or not self.deps[name] <= done:
+                        continue
+                    # A forced stage forces everything downstream of it
+                    is_forced = name in forced or bool(self.deps[name] & forced)
+                    if is_forced:
+                        forced.add(name)
+                    running[name] = pool.submit(self.run_stage, stage, is_forced)
+                finished, _ = wait(running.values(), return_when=FIRST_COMPLETED)
+                for name in [n for n, fut in running.items() if fut in finished]:
+                    key = running.pop(name).result()
+                    stage = self.stages[name]
+                    self.manifest[name] = {
+                        "key": key,
+                        "outputs": {p: _file_sig(p) for p in stage.outputs},
+                    }
+                    done.add(name)
+        self._write_manifest()
+        return self.stats
+
+
+def _fmt_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024:
+            return f"{n:.0f}{unit}"
+        n /= 1024
+    return f"{n:.1f}TB"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=9000, help="rows to generate")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--jobs", type=int, default=None, help="parallel stages")
+    parser.add_argument("--force", nargs="*", default=[], help="stages to rerun")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    pipeline = Pipeline(default_stages(args.rows, args.seed), jobs=args.jobs)
+    total = time.perf_counter()
+    pipeline.run(force=args.force)
+    log.info("pipeline done in %.2fs", time.perf_counter() - total)
@@ -0,0 +1,229 @@
+"""
+Startup: deferred loads, the boot-time warm-up and a cold-start profiler.
+
+Importing the app only imports code. The dataset, page2's model and its
+feature ranges load on first use, each behind its own accessor, and record
+how long they took with `timed()`. Modules register those accessors with
+`add_warmup()`; app.py runs them in a background thread when a worker boots
+(WARMUP=0 leaves everything to first use), so Gunicorn workers start serving
+at once and the data is usually ready before the first request needs it.
+
+A process forked while another thread holds a lock (a loader's, pandas' or
+the allocator's) would inherit that lock held forever. Background callbacks
+fork a job process per run (DiskcacheManager), and `gunicorn --preload` forks
+workers from the process that imported the app, so every fork in the process
+first waits for a running warm-up to finish (at most FORK_WAIT seconds), then
+takes the locks registered with `hold_across_fork()` (the dataset's, the live
+feed's, ...) and releases them on both sides once the child exists.
+
+Run this file to profile a cold start in fresh interpreters: import time
+per module (from `python -X importtime`) and load time per warm-up step.
+
+    python src/startup.py              # median of 3 cold starts
+    python src/startup.py --runs 5 --top 25
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, ".."))
+
+log = logging.getLogger("startup")
+
+LOADS = {}       # label -> seconds, for the deferred loads done in this process
+FORK_WAIT = 120  # seconds a fork waits for a running warm-up
+_warmups = []
+_idle = threading.Event()   # clear while a warm-up thread is running
+_idle.set()
+_fork_locks = []            # taken, in this order, around every fork
+_fork_hooks = False
+
+
+@contextmanager
+def timed(label):
+    """Record (and log) how long a deferred load took."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        LOADS[label] = time.perf_counter() - start
+        log.info("loaded %s in %.3fs", label, LOADS[label])
+
+
+def add_warmup(fn):
+    """Have `warm_up()` call `fn` (an accessor that loads on first use)."""
+    _warmups.append(fn)
+    return fn
+
+
+def warm_up():
+    for fn in list(_warmups):
+        fn()
+
+
+def _before_fork():
+    if not _idle.wait(FORK_WAIT):
+        log.warning("forking while the warm-up is still running (waited %ss)", FORK_WAIT)
+    for lock in _fork_locks:
+        lock.acquire()
+
+
+def _after_fork():
+    # Parent and child alike: in the child the forking thread is the one
+    # that took them, so the child starts with every lock free
+    for lock in reversed(_fork_locks):
+        lock.release()
+
+
+def _install_fork_hooks():
+    global _fork_hooks
+    if not _fork_hooks:
+        os.register_at_fork(before=_before_fork, after_in_parent=_after_fork, after_in_child=_after_fork)
+        _fork_hooks = True
+
+
+def hold_across_fork(lock):
+    """
+    Take `lock` around every fork from this process, so no child inherits it
+    held by a thread that doesn't exist there. Register a lock before any
+    lock that is taken while holding it (e.g. the dataset's before the live
+    feed's); the forking thread must not hold it.
+    """
+    _install_fork_hooks()
+    _fork_locks.append(lock)
+    return lock
+
+
+def start_warmup():
+    """Run the registered loaders in a background thread; forks wait for it."""
+    _install_fork_hooks()
+
+    def run():
+        try:
+            warm_up()
+        except Exception:
+            log.exception("warm-up failed; loads will be retried on first use")
+        finally:
+            _idle.set()
+
+    _idle.clear()
+    thread = threading.Thread(target=run, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+# -------------------
+# Cold-start profiler
+# -------------------
+def parse_importtime(text):
+    """
+    `-X importtime` lines as (name, depth, self seconds, cumulative seconds),
+    in the order Python prints them (a module after everything it imported).
+    """
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(own) / 1e6, int(cumulative) / 1e6))
+    return rows
+
+
+def _direct_imports(rows, module="app"):
+    # Depth-1 rows just before `module`'s own (depth-0) row are what it imported
+    # first. Pages are executed by Dash rather than imported, so their imports
+    # land here too and their own code counts towards the module's self time.
+    children = []
+    for name, depth, own, cumulative in rows:
+        if depth == 0:
+            if name == module:
+                return children
+            children = []
+        elif depth == 1:
+            children.append((name, own, cumulative))
+    return []
+
+
+def _child():
+    # Runs in the fresh interpreter: boot the app, then the warm-up, and report
+    os.environ["WARMUP"] = "0"
+    os.chdir(ROOT_DIR)  # as under Gunicorn (page2 resolves its model path from here)
+    sys.path.insert(0, BASE_DIR)
+    start = time.perf_counter()
+    import app  # noqa: F401
+    boot = time.perf_counter() - start
+    import startup  # the instance the app's modules registered with
+    start = time.perf_counter()
+    startup.warm_up()
+    warm = time.perf_counter() - start
+    print(json.dumps({"boot": boot, "warm_up": warm, "loads": startup.LOADS}))
+
+
+def profile(runs=3):
+    """Median boot / warm-up / per-load / per-import times over `runs` cold starts."""
+    reports, imports = [], []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--child"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+        )
+        reports.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        imports.append(parse_importtime(proc.stderr))
+
+    def median(values):
+        return statistics.median(values) if values else 0.0
+
+    loads = {label: median([r["loads"].get(label, 0.0) for r in reports])
+             for label in dict.fromkeys(label for r in reports for label in r["loads"])}
+    by_name = {}
+    for rows in imports:
+        for name, _, own, cumulative in rows:
+            by_name.setdefault(name, []).append((own, cumulative))
+    direct = [(name, median([by_name[name][i][1] for i in range(len(by_name[name]))]))
+              for name, _, _ in _direct_imports(imports[0])]
+    return {
+        "runs": runs,
+        "boot": median([r["boot"] for r in reports]),
+        "warm_up": median([r["warm_up"] for r in reports]),
+        "loads": loads,
+        "app_imports": sorted(direct, key=lambda item: -item[1]),
+        "modules": sorted(
+            ((name, median([o for o, _ in v]), median([c for _, c in v])) for name, v in by_name.items()),
+            key=lambda item: -item[1],
+        ),
+    }
+
+
+def print_profile(report, top=15):
+    print(f"Cold start, median of {report['runs']} fresh interpreters")
+    print(f"  {'import app (worker boot)':<40}{report['boot']:>8.3f}s")
+    print(f"  {'warm-up':<40}{report['warm_up']:>8.3f}s")
+    for label, seconds in report["loads"].items():
+        print(f"    {label:<38}{seconds:>8.3f}s")
+    print("\nImports made while importing app (cumulative)")
+    for name, seconds in report["app_imports"][:top]:
+        print(f"  {name:<40}{seconds:>8.3f}s")
+    print("\nSlowest modules (self time)")
+    for name, own, cumulative in report["modules"][:top]:
+        print(f"  {name:<40}{own:>8.3f}s  (cumulative {cumulative:.3f}s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="cold starts to take the median of")
+    parser.add_argument("--top", type=int, default=15, help="modules listed per table")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child()
+    else:
+        print_profile(profile(args.runs), args.top)
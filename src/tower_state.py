@@ -0,0 +1,184 @@
+"""
+Latest state per tower: a materialized view with one compact row per tower.
+
+Each incoming record costs O(1) (amortized): it replaces the tower's latest
+values and is pushed onto that tower's 1h / 24h windows, whose running sums
+are adjusted as old readings fall out. A fleet snapshot is then O(towers),
+whatever the length of the history.
+
+Windows are in event time. Records older than a tower's latest one are
+counted as late and skipped (ingestion is ordered per source).
+
+    python src/tower_state.py   # build over the app's data, check the windows
+"""
+import threading
+from collections import deque
+
+import pandas as pd
+
+WINDOWS = {"1h": pd.Timedelta(hours=1), "24h": pd.Timedelta(hours=24)}
+KPI_COLS = ["latency_sec", "call_drop_rate", "bandwidth_numeric", "dropped_calls", "total_calls"]
+INFO_COLS = ["operator", "network_type", "location.latitude", "location.longitude"]
+FLAG_COL = "anomaly"
+
+
+class _Window:
+    __slots__ = ("span", "items", "count", "flags", "sums")
+
+    def __init__(self, span, n_kpis):
+        self.span = span
+        self.items = deque()
+        self.count = 0
+        self.flags = 0
+        self.sums = [0.0] * n_kpis
+
+    def push(self, ts, values, flag):
+        self.items.append((ts, values, flag))
+        self.count += 1
+        self.flags += flag
+        for i, v in enumerate(values):
+            self.sums[i] += v
+        self.evict(ts)
+
+    def evict(self, now):
+        cutoff = now - self.span
+        while self.items and self.items[0][0] <= cutoff:
+            _, values, flag = self.items.popleft()
+            self.count -= 1
+            self.flags -= flag
+            for i, v in enumerate(values):
+                self.sums[i] -= v
+        if not self.items:
+            self.sums = [0.0] * len(self.sums)  # no float drift on empty windows
+
+
+class TowerState:
+    def __init__(self, kpi_cols=KPI_COLS, info_cols=INFO_COLS, flag_col=FLAG_COL, windows=WINDOWS):
+        self.kpi_cols = list(kpi_cols)
+        self.info_cols = list(info_cols)
+        self.flag_col = flag_col
+        self.windows = dict(windows)
+        self.version = 0
+        self.late = 0
+        self._towers = {}
+        self._lock = threading.Lock()
+
+    def _apply(self, tower_id, ts, info, values, flag):
+        tower = self._towers.get(tower_id)
+        if tower is None:
+            tower = self._towers[tower_id] = {
+                "windows": {name: _Window(span, len(values)) for name, span in self.windows.items()},
+            }
+        elif ts <= tower["timestamp"]:
+            self.late += 1
+            return
+        tower["timestamp"] = ts
+        tower["info"] = info
+        tower["values"] = values
+        tower["flag"] = flag
+        for window in tower["windows"].values():
+            window.push(ts, values, flag)
+
+    def update(self, record):
+        """Apply one record (a dict with tower_id, timestamp and the KPI columns)."""
+        flag = self.flag_col is not None and record.get(self.flag_col) == "Anomaly"
+        with self._lock:
+            self._apply(
+                record["tower_id"], pd.Timestamp(record["timestamp"]),
+                tuple(record.get(c) for c in self.info_cols),
+                tuple(float(record[c]) for c in self.kpi_cols),
+                int(flag),
+            )
+            self.version += 1
+
+    def update_frame(self, frame):
+        """Apply a batch of rows in timestamp order (still O(1) per row)."""
+        if frame.empty:
+            return
+        frame = frame.sort_values("timestamp", kind="stable")
+        flags = (frame[self.flag_col] == "Anomaly") if self.flag_col in frame.columns else pd.Series(False, index=frame.index)
+        rows = zip(
+            frame["tower_id"].to_numpy(),
+            frame["timestamp"],
+            frame.reindex(columns=self.info_cols).itertuples(index=False, name=None),
+            frame[self.kpi_cols].astype(float).itertuples(index=False, name=None),
+            flags.astype(int).to_numpy(),
+        )
+        with self._lock:
+            for tower_id, ts, info, values, flag in rows:
+                self._apply(tower_id, ts, info, values, int(flag))
+            self.version += 1
+
+    def seed(self, frame):
+        """Build from history, replaying only what the widest window still needs."""
+        if frame.empty:
+            return self
+        widest = max(self.windows.values())
+        last = frame.groupby("tower_id")["timestamp"].transform("max")
+        self.update_frame(frame[frame["timestamp"] > last - widest])
+        return self
+
+    def __len__(self):
+        return len(self._towers)
+
+    def snapshot(self, operators=None, network_types=None, now=None):
+        """
+        One row per tower: latest timestamp, info, KPIs and anomaly flag, plus
+        readings / anomalies / KPI means per rolling window. Each tower's
+        windows end at its own latest reading (towers report at different
+        rates); pass `now`, a wall-clock Timestamp, to age them all to that
+        time instead. O(towers).
+        """
+        with self._lock:
+            rows = []
+            for tower_id, tower in self._towers.items():
+                info = dict(zip(self.info_cols, tower["info"]))
+                if operators and info.get("operator") not in operators:
+                    continue
+                if network_types and info.get("network_type") not in network_types:
+                    continue
+                row = {"tower_id": tower_id, "timestamp": tower["timestamp"], **info}
+                row.update(zip(self.kpi_cols, tower["values"]))
+                if self.flag_col is not None:
+                    row[self.flag_col] = "Anomaly" if tower["flag"] else "Normal"
+                for name, window in tower["windows"].items():
+                    if now is not None:
+                        window.evict(now)
+                    row[f"readings_{name}"] = window.count
+                    row[f"anomalies_{name}"] = window.flags
+                    for col, total in zip(self.kpi_cols, window.sums):
+                        row[f"{col}_{name}"] = total / window.count if window.count else None
+                rows.append(row)
+        return pd.DataFrame(rows)
+
+
+_state = None
+_state_lock = threading.Lock()
+
+
+def get_tower_state(dataset=None):
+    """Process-wide view over the app's dataset, kept current as rows are appended."""
+    global _state
+    with _state_lock:
+        if _state is None:
+            if dataset is None:
+                from dataset import get_dataset
+                dataset = get_dataset()
+            # Seeded and subscribed atomically, so no append slips between
+            state = TowerState()
+            dataset.subscribe(state.update_frame, seed=state.seed)
+            _state = state
+    return _state
+
+
+if __name__ == "__main__":
+    # Build the view over the app's data and check every tower's windows
+    from dataset import get_dataset
+
+    status = get_tower_state(get_dataset()).snapshot()
+    for name in WINDOWS:
+        empty = status[status[f"readings_{name}"] == 0]
+        print(f"{name}: {len(status) - len(empty)}/{len(status)} towers with readings, "
+              f"median {status[f'readings_{name}'].median():g} per tower")
+        # The latest reading is always inside the tower's own window
+        assert empty.empty, f"{len(empty)} towers with recent readings have an empty {name} window"
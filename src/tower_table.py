@@ -0,0 +1,151 @@
+"""
+Per-tower aggregate table for the dashboard's tower DataTable.
+
+Running sums are kept per (tower_id, operator, network_type) and bumped with
+each batch of new rows, so history is never rescanned. A filtered view (one
+row per tower) is derived from those group sums and cached per data version.
+Pages are cut with a partial sort: only the rows up to the requested page are
+ordered, and only the rows on the page are turned into records.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from cache import LRUCache
+
+GROUP_COLS = ["tower_id", "operator", "network_type"]
+SUM_COLS = ["call_drop_rate", "dropped_calls", "total_calls", "latency_sec"]
+
+# Columns shown in the table, in order
+TABLE_COLS = ["tower_id", "avg_call_drop_rate", "num_dropped_calls", "total_calls", "avg_latency", "readings"]
+DEFAULT_SORT = [{"column_id": "avg_call_drop_rate", "direction": "desc"}]
+
+# DataTable filter_query operators (custom filtering mode)
+FILTER_OPERATORS = [
+    ["ge ", ">="], ["le ", "<="], ["lt ", "<"], ["gt ", ">"],
+    ["ne ", "!="], ["eq ", "="], ["contains "],
+]
+
+
+def split_filter_part(filter_part):
+    """('column', 'op', value) for one `{column} op value` clause of a filter_query."""
+    for operator_type in FILTER_OPERATORS:
+        for operator in operator_type:
+            if operator in filter_part:
+                name_part, value_part = filter_part.split(operator, 1)
+                name = name_part[name_part.find("{") + 1: name_part.rfind("}")]
+                value_part = value_part.strip()
+                v0 = value_part[:1]
+                if v0 and v0 == value_part[-1] and v0 in ("'", '"', "`"):
+                    value = value_part[1:-1].replace("\\" + v0, v0)
+                else:
+                    # Kept as typed: "1050" must not become "1050.0" for a
+                    # text match; apply_filter_query converts per column
+                    value = value_part
+                # word operators ("ge ") map onto their symbol
+                return name, operator_type[0].strip(), value
+    return None, None, None
+
+
+def apply_filter_query(view, filter_query):
+    for filter_part in (filter_query or "").split(" && "):
+        col, op, value = split_filter_part(filter_part)
+        if col not in view.columns:
+            continue
+        if op in ("eq", "ne", "lt", "le", "gt", "ge"):
+            column = view[col]
+            if pd.api.types.is_numeric_dtype(column):
+                value = pd.to_numeric(value, errors="coerce")
+                if pd.isna(value):
+                    continue  # not a number (e.g. still being typed): clause ignored
+            else:
+                column = column.astype(str)
+            view = view.loc[getattr(column, op)(value)]
+        elif op == "contains":
+            view = view.loc[view[col].astype(str).str.contains(str(value), regex=False)]
+    return view
+
+
+def _page_order(view, sort_by, start, stop):
+    """Positions of rows [start, stop) of `view` in `sort_by` order (partial sort)."""
+    sort_by = sort_by or DEFAULT_SORT
+    col, desc = sort_by[0]["column_id"], sort_by[0]["direction"] == "desc"
+    if len(sort_by) > 1 or view[col].dtype == object:
+        # Multi-column or text sort: full sort (the table has one row per tower)
+        ordered = view.reset_index(drop=True).sort_values(
+            [s["column_id"] for s in sort_by],
+            ascending=[s["direction"] == "asc" for s in sort_by],
+            kind="stable",
+        )
+        return ordered.index.to_numpy()[start:stop]
+    key = view[col].to_numpy(dtype=float)
+    key = -key if desc else key
+    key = np.where(np.isnan(key), np.inf, key)  # NaN last either way
+    if stop < len(key):
+        top = np.argpartition(key, stop - 1)[:stop]
+    else:
+        top = np.arange(len(key))
+    top = top[np.argsort(key[top], kind="stable")]
+    return top[start:stop]
+
+
+class TowerTable:
+    def __init__(self, frame=None):
+        self.version = 0
+        self._lock = threading.Lock()
+        self._views = LRUCache(maxsize=32, ttl=600)
+        self.sums = pd.DataFrame(
+            columns=SUM_COLS + ["readings"],
+            index=pd.MultiIndex.from_tuples([], names=GROUP_COLS),
+            dtype=float,
+        )
+        if frame is not None:
+            self.update(frame)
+
+    def update(self, rows):
+        """Add a batch of rows to the running sums (costs the batch, not the history)."""
+        if rows.empty:
+            return
+        grouped = rows.groupby(GROUP_COLS)
+        delta = grouped[SUM_COLS].sum()
+        delta["readings"] = grouped.size()
+        with self._lock:
+            self.sums = self.sums.add(delta, fill_value=0)
+            self.version += 1
+
+    def view(self, operators=None, network_types=None):
+        """One row per tower over the selected operators / network types."""
+        with self._lock:
+            sums, version = self.sums, self.version
+        key = (tuple(sorted(operators or [])), tuple(sorted(network_types or [])), version)
+        return self._views.get_or_build(key, lambda: self._build_view(sums, operators, network_types))
+
+    @staticmethod
+    def _build_view(sums, operators, network_types):
+        if operators:
+            sums = sums[sums.index.get_level_values("operator").isin(operators)]
+        if network_types:
+            sums = sums[sums.index.get_level_values("network_type").isin(network_types)]
+        towers = sums.groupby(level="tower_id").sum()
+        return pd.DataFrame({
+            "tower_id": towers.index,
+            "avg_call_drop_rate": (towers["call_drop_rate"] / towers["readings"]).round(2).to_numpy(),
+            "num_dropped_calls": towers["dropped_calls"].astype(int).to_numpy(),
+            "total_calls": towers["total_calls"].astype(int).to_numpy(),
+            "avg_latency": (towers["latency_sec"] / towers["readings"]).round(3).to_numpy(),
+            "readings": towers["readings"].astype(int).to_numpy(),
+        })
+
+    def page(self, operators=None, network_types=None, page_current=0, page_size=10,
+             sort_by=None, filter_query=""):
+        """(records for one page, page count) for a custom-paged DataTable."""
+        view = apply_filter_query(self.view(operators, network_types), filter_query)
+        page_count = max(1, -(-len(view) // page_size))
+        start = page_current * page_size
+        positions = _page_order(view, sort_by, start, min(start + page_size, len(view)))
+        return view.iloc[positions].to_dict("records"), page_count
+
+    def top(self, k=10, operators=None, network_types=None):
+        """The k towers with the highest average drop rate."""
+        return self.page(operators, network_types, 0, k)[0]